@@ -0,0 +1,609 @@
+# 자세 분석 모듈
+# 센서 보정 등 (n, 16) 배열 단위로 동작하는 분석 단계를 모아둔다.
+
+import os
+import json
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from sensor_stream import SENSOR_COUNT, as_batch
+
+
+ADC_MAX = 1024
+
+# 4x4 매트 배치: A1~A4 가 앞줄, 각 줄은 왼쪽부터 오른쪽 순서
+GRID_SIZE = 4
+SENSOR_COLS = np.arange(SENSOR_COUNT) % GRID_SIZE
+SENSOR_ROWS = np.arange(SENSOR_COUNT) // GRID_SIZE
+# 매트 중심을 원점으로 한 좌표 (-1 ~ 1, x: 오른쪽 +, y: 뒤쪽 +)
+SENSOR_X = (SENSOR_COLS - (GRID_SIZE - 1) / 2) / ((GRID_SIZE - 1) / 2)
+SENSOR_Y = (SENSOR_ROWS - (GRID_SIZE - 1) / 2) / ((GRID_SIZE - 1) / 2)
+
+FEATURE_DTYPE = np.dtype([
+    ('total', '<f4'),       # 총 하중
+    ('cop_x', '<f4'),       # 압력 중심 좌우 위치
+    ('cop_y', '<f4'),       # 압력 중심 앞뒤 위치
+    ('lr_balance', '<f4'),  # (오른쪽 - 왼쪽) / 총 하중
+    ('fb_balance', '<f4'),  # (뒤쪽 - 앞쪽) / 총 하중
+    ('contact', 'u1'),      # 접촉 센서 수
+    ('peak', 'u1'),         # 최대 하중 센서 번호 (0 부터)
+])
+
+# 분류기 입력으로 쓰는 실수형 특징 순서
+FEATURE_VECTOR_FIELDS = ['cop_x', 'cop_y', 'lr_balance', 'fb_balance', 'contact']
+
+
+class SensorCalibration:
+    """채널별 ADC -> 하중 변환 테이블
+
+    채널마다 (ADC, 하중) 보정점을 저장하고, 0~ADC_MAX 전체에 대해 미리 보간한
+    (16, ADC_MAX + 1) 테이블에서 한 번의 인덱싱으로 배치를 변환한다.
+    """
+
+    def __init__(self, points=None, unit='ADC', channels=SENSOR_COUNT):
+        self.channels = channels
+        self.unit = unit
+        # 보정점이 없으면 ADC 값을 그대로 사용
+        self.points = points or [[(0, 0.0), (ADC_MAX, float(ADC_MAX))] for _ in range(channels)]
+        self._build_table()
+
+    def _build_table(self):
+        adc = np.arange(ADC_MAX + 1)
+        table = np.empty((self.channels, ADC_MAX + 1), dtype=np.float32)
+        for channel, points in enumerate(self.points):
+            points = sorted(points)
+            if len(points) < 2:
+                points = [(0, 0.0)] + points
+            xs = np.array([p[0] for p in points], dtype=np.float64)
+            ys = np.array([p[1] for p in points], dtype=np.float64)
+            # 하중은 ADC 에 대해 단조 증가하도록 보정
+            table[channel] = np.interp(adc, xs, np.maximum.accumulate(ys))
+        self.table = table
+        self.channel_index = np.arange(self.channels)
+
+    @property
+    def is_identity(self):
+        return self.unit == 'ADC'
+
+    def max_output(self):
+        return float(self.table[:, -1].max())
+
+    def process(self, timestamps, values):
+        return self.apply(values)
+
+    def apply(self, values):
+        """(n, 16) ADC 배치를 하중으로 변환"""
+        values = as_batch(values, self.channels)
+        index = np.clip(np.rint(values), 0, ADC_MAX).astype(np.intp)
+        return self.table[self.channel_index, index]
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'unit': self.unit, 'points': self.points}, f)
+
+    @classmethod
+    def load(cls, path, channels=SENSOR_COUNT):
+        """보정 파일 로드 (없으면 기본 변환)"""
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(channels=channels)
+        points = [[tuple(point) for point in channel] for channel in data['points']]
+        return cls(points, data.get('unit', 'kg'), channels)
+
+
+class CalibrationCapture:
+    """기준 하중을 올려 채널별 평균 ADC 를 측정하는 보정 작업
+
+    start_step(하중) 후 samples_per_step 개의 샘플이 들어오면 해당 단계의
+    채널별 평균 ADC 가 기록된다. 하중은 매트 전체에 올린 무게이며, 첫 단계는
+    빈 매트(0) 로 측정하는 것이 좋다. 파이프라인 단계로 사용할 수 있다.
+    """
+
+    MIN_ADC_RISE = 5.0  # 하중을 올렸을 때 이보다 적게 오른 채널은 하중을 받지 않은 것으로 봄
+
+    def __init__(self, samples_per_step=50, unit='kg', channels=SENSOR_COUNT):
+        self.samples_per_step = samples_per_step
+        self.unit = unit
+        self.channels = channels
+        self.steps = []     # (기준 하중, 채널별 평균 ADC)
+        self.rejected = []  # 마지막 build 에서 ADC 가 오르지 않아 보정하지 못한 채널
+        self.current_load = None
+        self._sum = np.zeros(channels)
+        self._count = 0
+
+    @property
+    def capturing(self):
+        return self.current_load is not None
+
+    @property
+    def progress(self):
+        """현재 단계에서 모은 샘플 수"""
+        return self._count if self.capturing else 0
+
+    def start_step(self, load):
+        self.current_load = float(load)
+        self._sum[:] = 0
+        self._count = 0
+
+    def process(self, timestamps, values):
+        values = as_batch(values, self.channels)
+        if self.capturing:
+            needed = self.samples_per_step - self._count
+            taken = values[:needed]
+            self._sum += taken.sum(axis=0)
+            self._count += len(taken)
+            if self._count >= self.samples_per_step:
+                self.steps.append((self.current_load, self._sum / self._count))
+                self.current_load = None
+        return values
+
+    def build(self):
+        """측정한 단계들로 보정 테이블 생성
+
+        단계 사이의 하중 증가분을 그 사이 ADC 가 오른 채널들에 ADC 증가량 비율로
+        나눠, 채널별 누적 하중을 보정점으로 삼는다 (채널 하중의 합 = 올린 하중).
+        ADC 가 한 번도 오르지 않은 채널은 하중 0 으로 두고 rejected 에 남긴다.
+        """
+        steps = sorted(self.steps, key=lambda step: step[0])
+        if steps[0][0] > 0:
+            # 빈 매트 단계가 없으면 ADC 0 을 하중 0 으로 봄
+            steps.insert(0, (0.0, np.zeros(self.channels)))
+        previous_load, previous_adc = steps[0][0], np.asarray(steps[0][1], dtype=np.float64)
+        points = [[(float(adc), 0.0)] for adc in previous_adc]
+        loads = np.zeros(self.channels)
+        for load, adc in steps[1:]:
+            rise = np.asarray(adc, dtype=np.float64) - previous_adc
+            rising = rise >= self.MIN_ADC_RISE
+            if load <= previous_load or not rising.any():
+                continue
+            loads[rising] += (load - previous_load) * rise[rising] / rise[rising].sum()
+            for channel in np.flatnonzero(rising):
+                points[channel].append((float(adc[channel]), float(loads[channel])))
+            previous_load = load
+            previous_adc = np.where(rising, adc, previous_adc)
+
+        self.rejected = [channel for channel in range(self.channels) if len(points[channel]) < 2]
+        for channel, channel_points in enumerate(points):
+            if len(channel_points) < 2:
+                channel_points[:] = [(0.0, 0.0), (float(ADC_MAX), 0.0)]
+            elif channel_points[-1][0] < ADC_MAX:
+                # 측정한 최대 ADC 위로는 마지막 구간의 기울기로 연장
+                (x0, y0), (x1, y1) = channel_points[-2:]
+                channel_points.append((float(ADC_MAX), y1 + (ADC_MAX - x1) * (y1 - y0) / (x1 - x0)))
+        return SensorCalibration(points, self.unit, self.channels)
+
+
+class BaselineNormalizer:
+    """사용자별 중립 자세 기준 정규화
+
+    처음 learn_samples 개의 착석 샘플로 채널별 중립 자세 분포 (중앙값과 사분위
+    범위) 를 학습하고, 중립 자세에서 채널마다 같은 몫이 되도록 채널별 scale 을
+    정해 벡터 연산으로 적용한다. 전체 크기는 체중(보정된 kg 단위일 때) 또는
+    학습된 총 하중을 기준 하중으로 삼으므로, 바르게 앉으면 합이 약 1 이고 압력
+    중심은 0 근처이다. 특징 계산 앞에 두어 접촉/착석/균형 판단 기준이 체형과
+    관계없이 같게 한다. 학습 전에는 모든 채널에 같은 scale 을 쓴다.
+    """
+
+    SEAT_LOAD_RATIO = 0.75  # 앉았을 때 좌판이 받는 체중 비율
+    OCCUPIED_RATIO = 0.2    # 정규화된 총 하중이 이보다 작으면 미착석
+    MIN_SHARE = 0.05        # 채널 기준값 하한 (채널 중앙값 평균 대비, 거의 눌리지 않는 채널용)
+
+    def __init__(self, weight=0.0, unit='ADC', learn_samples=300, channels=SENSOR_COUNT):
+        self.weight = weight
+        self.unit = unit
+        self.learn_samples = learn_samples
+        self.channels = channels
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._samples = np.zeros((self.learn_samples, self.channels))
+        self.neutral = np.zeros(self.channels)  # 학습된 중립 자세 채널 중앙값
+        self.spread = np.zeros(self.channels)   # 채널별 사분위 범위
+        self.scale = np.full(self.channels, 1.0 / self._default_reference())
+
+    @property
+    def learning(self):
+        return self.count < self.learn_samples
+
+    @property
+    def occupied_threshold(self):
+        """착석으로 판단하는 최소 총 하중"""
+        return 5.0 if self.unit == 'kg' else 300.0
+
+    def _default_reference(self):
+        if self.unit == 'kg' and self.weight > 0:
+            return self.weight * self.SEAT_LOAD_RATIO
+        return float(self.channels * ADC_MAX) / 4
+
+    def set_profile(self, weight, unit):
+        """체중이나 보정 단위가 바뀌면 기준 하중 다시 계산"""
+        if weight == self.weight and unit == self.unit:
+            return
+        if unit != self.unit:
+            # 단위가 바뀌면 학습한 평균도 의미가 달라지므로 다시 학습
+            self.unit = unit
+            self.weight = weight
+            self.reset()
+            return
+        self.weight = weight
+        self._update_coefficients()
+
+    def _update_coefficients(self):
+        if self.count == 0:
+            self.scale[:] = 1.0 / self._default_reference()
+            return
+        samples = self._samples[:self.count]
+        self.neutral = np.median(samples, axis=0)
+        lower, upper = np.percentile(samples, [25, 75], axis=0)
+        self.spread = upper - lower
+        total = max(self.neutral.sum(), 1e-6)
+        if self.unit == 'kg' and self.weight > 0:
+            reference = self.weight * self.SEAT_LOAD_RATIO
+        else:
+            reference = total
+        # 중립 자세에서 채널마다 (총 하중 / 기준 하중) / 채널 수 가 되도록
+        base = np.maximum(self.neutral, np.maximum(self.spread, self.MIN_SHARE * total / self.channels))
+        self.scale = (total / reference) / (self.channels * base)
+
+    def process(self, timestamps, values):
+        values = as_batch(values, self.channels)
+        if self.learning:
+            occupied = values[values.sum(axis=1) >= self.occupied_threshold]
+            taken = occupied[:self.learn_samples - self.count]
+            if len(taken):
+                self._samples[self.count:self.count + len(taken)] = taken
+                self.count += len(taken)
+                self._update_coefficients()
+        return values * self.scale
+
+    def to_dict(self):
+        return {
+            'weight': self.weight,
+            'unit': self.unit,
+            'count': self.count,
+            'samples': self._samples[:self.count].tolist(),
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path, weight, unit, learn_samples=300, channels=SENSOR_COUNT):
+        """저장된 기준 자세 로드 (체중/단위가 다르면 다시 학습)"""
+        normalizer = cls(weight, unit, learn_samples, channels)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return normalizer
+        if data.get('unit') == unit and data.get('weight') == weight:
+            if 'samples' in data:
+                samples = np.array(data['samples'], dtype=np.float64).reshape(-1, channels)
+            else:
+                # 예전 형식 (채널 합계만 저장): 평균을 중립 자세 값으로 사용
+                samples = np.tile(np.array(data['sum']) / max(data['count'], 1), (data['count'], 1))
+            samples = samples[:learn_samples]
+            normalizer._samples[:len(samples)] = samples
+            normalizer.count = len(samples)
+            normalizer._update_coefficients()
+        return normalizer
+
+
+def extract_features(values, contact_threshold=20.0):
+    """(n, 16) 하중 배치에서 압력 중심, 균형 지수, 접촉 면적, 최대 위치 계산"""
+    values = np.maximum(as_batch(values), 0.0)
+    total = values.sum(axis=1)
+    safe_total = np.where(total > 0, total, 1.0)
+
+    right = values[:, SENSOR_X > 0].sum(axis=1)
+    left = values[:, SENSOR_X < 0].sum(axis=1)
+    back = values[:, SENSOR_Y > 0].sum(axis=1)
+    front = values[:, SENSOR_Y < 0].sum(axis=1)
+
+    features = np.zeros(len(values), dtype=FEATURE_DTYPE)
+    features['total'] = total
+    features['cop_x'] = values @ SENSOR_X / safe_total
+    features['cop_y'] = values @ SENSOR_Y / safe_total
+    features['lr_balance'] = (right - left) / safe_total
+    features['fb_balance'] = (back - front) / safe_total
+    features['contact'] = (values >= contact_threshold).sum(axis=1)
+    features['peak'] = values.argmax(axis=1)
+    return features
+
+
+def feature_vectors(features):
+    """특징 구조체 배열을 (n, k) 실수 행렬로 변환"""
+    return np.stack([features[name].astype(np.float64) for name in FEATURE_VECTOR_FIELDS], axis=1)
+
+
+class FeatureExtractor:
+    """하중 배치에서 특징을 계산해 두는 파이프라인 단계 (입력은 그대로 전달)
+
+    BaselineNormalizer 뒤에 두므로 입력은 기준 하중 대비 비율이다.
+    """
+
+    CONTACT_RATIO = 0.005  # 접촉으로 보는 최소 채널 하중 (기준 하중 대비)
+
+    def __init__(self, contact_threshold=CONTACT_RATIO):
+        self.contact_threshold = contact_threshold
+        self.latest = np.zeros(0, dtype=FEATURE_DTYPE)
+
+    def process(self, timestamps, values):
+        self.latest = extract_features(values, self.contact_threshold)
+        return values
+
+
+def is_bad_posture(posture):
+    """0(미착석), 1(바른 자세) 외에는 나쁜 자세"""
+    return posture not in (0, 1)
+
+
+class PostureStateMachine:
+    """다수결 + 히스테리시스 + 최소 유지 시간으로 자세 상태 결정
+
+    최근 window 개 예측 중 나쁜 자세 비율이 enter_ratio 이상이면 '불량',
+    exit_ratio 이하이면 '양호' 로 바뀐다. 상태가 바뀐 뒤 min_dwell 초 동안은
+    다시 바뀌지 않는다. update() 는 상태가 실제로 바뀔 때만 이벤트를 반환한다.
+    state_posture 는 마지막 전환 때의 다수 자세로, 다음 전환까지 유지된다.
+    """
+
+    GOOD = '양호'
+    BAD = '불량'
+
+    def __init__(self, window=10, enter_ratio=0.7, exit_ratio=0.3, min_dwell=5.0):
+        self.window = window
+        self.enter_ratio = enter_ratio
+        self.exit_ratio = exit_ratio
+        self.min_dwell = min_dwell
+        self.reset()
+
+    def reset(self):
+        self.labels = deque()
+        self.label_counts = {}
+        self.bad_count = 0
+        self.state = None
+        self.state_since = None
+        self.state_posture = None
+
+    @property
+    def majority_posture(self):
+        """윈도우 안에서 가장 많이 나온 예측 자세"""
+        if not self.label_counts:
+            return None
+        return max(self.label_counts, key=self.label_counts.get)
+
+    def _push(self, posture):
+        self.labels.append(posture)
+        self.label_counts[posture] = self.label_counts.get(posture, 0) + 1
+        self.bad_count += is_bad_posture(posture)
+        if len(self.labels) > self.window:
+            old = self.labels.popleft()
+            self.label_counts[old] -= 1
+            if not self.label_counts[old]:
+                del self.label_counts[old]
+            self.bad_count -= is_bad_posture(old)
+
+    def update(self, timestamp, posture):
+        """예측 하나 반영. 상태가 바뀌면 전환 이벤트(dict), 아니면 None"""
+        self._push(posture)
+        bad_ratio = self.bad_count / len(self.labels)
+
+        if self.state is None:
+            # 윈도우의 절반이 찰 때까지는 판단 보류
+            if len(self.labels) < max(self.window // 2, 1):
+                return None
+            new_state = self.BAD if bad_ratio >= 0.5 else self.GOOD
+        elif timestamp - self.state_since < self.min_dwell:
+            return None
+        elif self.state == self.GOOD and bad_ratio >= self.enter_ratio:
+            new_state = self.BAD
+        elif self.state == self.BAD and bad_ratio <= self.exit_ratio:
+            new_state = self.GOOD
+        else:
+            return None
+
+        event = {
+            'from': self.state,
+            'to': new_state,
+            'timestamp': timestamp,
+            'duration': 0.0 if self.state_since is None else timestamp - self.state_since,
+            'posture': self.majority_posture,
+        }
+        self.state = new_state
+        self.state_since = timestamp
+        self.state_posture = event['posture']
+        return event
+
+    def process(self, timestamps, postures):
+        """배치 처리. 발생한 전환 이벤트 목록 반환"""
+        events = []
+        for timestamp, posture in zip(timestamps, postures):
+            event = self.update(float(timestamp), int(posture))
+            if event is not None:
+                events.append(event)
+        return events
+
+
+class PostureSessionizer:
+    """샘플 흐름을 착석 세션과 자세 구간으로 나누고 자세별 시간을 누적
+
+    각 샘플은 다음 샘플까지의 시간(max_gap 초 이하일 때만)을 자기 자세에
+    더한다. 자세 0 은 미착석으로 보며, stand_gap 초 이상 이어지거나 데이터가
+    max_gap 초 넘게 끊기면 세션이 끝난다. 자세 구간은 구간 자세(보통
+    PostureStateMachine.state_posture)가 바뀔 때 나눈다. 일별/시간별 합계는 자세 번호로
+    인덱싱한 배열에 바로 누적되므로 조회는 O(1) 이다. 합계는 daily_days /
+    hourly_days 일만 보관한다 (그 이전은 기록 요약에서 조회).
+    """
+
+    POSTURE_SLOTS = 256  # 범위 밖 자세 번호는 마지막 칸 (알 수 없는 나쁜 자세) 에 합산
+
+    def __init__(self, max_gap=10.0, stand_gap=30.0, daily_days=90, hourly_days=2):
+        self.max_gap = max_gap
+        self.stand_gap = stand_gap
+        self.daily_days = daily_days
+        self.hourly_days = hourly_days
+        self.daily = {}     # 'YYYY-MM-DD' -> 자세별 초
+        self.hourly = {}    # 'YYYY-MM-DD HH' -> 자세별 초
+        self.reset_stream()
+
+    def reset_stream(self):
+        """연결이 끊겼을 때 진행 중인 세션/구간 없이 다시 시작"""
+        self.last_time = None
+        self.last_posture = None
+        self.session_start = None
+        self.unoccupied_since = None
+        self.interval_start = None
+        self.interval_posture = None  # 현재 구간의 자세
+        self.interval_from = 0  # 현재 구간 직전의 자세
+        self.session_seated = 0.0  # 진행 중인 세션의 착석 시간
+        self.session_bad = 0.0     # 그중 나쁜 자세 시간
+
+    def close_stream(self):
+        """진행 중인 자세 구간과 세션을 마지막 샘플 시각에서 끝내고 스트림 초기화"""
+        closed = []
+        if self.last_time is not None:
+            if self.interval_posture:
+                closed.append({'type': 'interval', 'posture': self.interval_posture,
+                               'from': self.interval_from,
+                               'start': self.interval_start, 'end': self.last_time})
+            if self.session_start is not None:
+                closed.append(self._close_session(self.unoccupied_since or self.last_time))
+        self.reset_stream()
+        return closed
+
+    def _close_session(self, end):
+        session = {'type': 'session', 'start': self.session_start, 'end': end,
+                   'seated': self.session_seated, 'bad': self.session_bad}
+        self.session_start = None
+        self.session_seated = self.session_bad = 0.0
+        return session
+
+    def _credit(self, timestamp, posture, seconds):
+        moment = datetime.fromtimestamp(timestamp)
+        day = moment.strftime('%Y-%m-%d')
+        hour = moment.strftime('%Y-%m-%d %H')
+        if day not in self.daily:
+            self.daily[day] = np.zeros(self.POSTURE_SLOTS)
+        if hour not in self.hourly:
+            self.hourly[hour] = np.zeros(self.POSTURE_SLOTS)
+        slot = posture if 0 <= posture < self.POSTURE_SLOTS else self.POSTURE_SLOTS - 1
+        self.daily[day][slot] += seconds
+        self.hourly[hour][slot] += seconds
+        self.session_seated += seconds
+        if is_bad_posture(posture):
+            self.session_bad += seconds
+
+    def update(self, timestamp, posture, episode_posture=None):
+        """샘플 하나 반영. 끝난 자세 구간/세션 목록 반환
+
+        episode_posture 는 구간 자세 (없으면 posture). 예측 노이즈마다 구간이
+        생기지 않도록 상태 머신이 정한 자세를 넘긴다.
+        """
+        episode_posture = posture if episode_posture is None else episode_posture
+        closed = []
+        gap = self.last_time is not None and timestamp - self.last_time > self.max_gap
+
+        if self.last_time is not None:
+            if not gap and self.last_posture != 0:
+                self._credit(self.last_time, self.last_posture, timestamp - self.last_time)
+
+            # 구간 자세가 바뀌거나 데이터가 끊기면 이전 자세 구간 종료
+            if gap or episode_posture != self.interval_posture:
+                end = self.last_time if gap else timestamp
+                if self.interval_posture:
+                    closed.append({'type': 'interval', 'posture': self.interval_posture,
+                                   'from': self.interval_from,
+                                   'start': self.interval_start, 'end': end})
+                self.interval_from = 0 if gap else (self.interval_posture or 0)
+                self.interval_start = timestamp
+                self.interval_posture = episode_posture
+
+            # 세션 종료: 데이터 끊김 또는 일정 시간 이상 미착석
+            if self.session_start is not None:
+                if gap:
+                    closed.append(self._close_session(self.unoccupied_since or self.last_time))
+                elif posture == 0 and self.unoccupied_since is not None \
+                        and timestamp - self.unoccupied_since >= self.stand_gap:
+                    closed.append(self._close_session(self.unoccupied_since))
+        else:
+            self.interval_start = timestamp
+            self.interval_posture = episode_posture
+
+        if posture != 0:
+            self.unoccupied_since = None
+            if self.session_start is None:
+                self.session_start = timestamp
+        elif self.unoccupied_since is None or gap:
+            self.unoccupied_since = timestamp
+
+        self.last_time = timestamp
+        self.last_posture = posture
+        return closed
+
+    def posture_seconds(self, day=None):
+        """하루 동안 자세별 누적 시간 (초, 자세 번호로 인덱싱)"""
+        day = day or datetime.now().strftime('%Y-%m-%d')
+        return self.daily.get(day, np.zeros(self.POSTURE_SLOTS))
+
+    def hour_seconds(self, day=None, hour=None):
+        moment = datetime.now()
+        day = day or moment.strftime('%Y-%m-%d')
+        hour = moment.hour if hour is None else hour
+        return self.hourly.get(f'{day} {hour:02d}', np.zeros(self.POSTURE_SLOTS))
+
+    def bad_seconds(self, day=None):
+        """하루 동안 나쁜 자세(0, 1 이외) 누적 시간"""
+        seconds = self.posture_seconds(day)
+        return float(seconds[2:].sum())
+
+    def prune(self, now):
+        """보관 기간이 지난 일별/시간별 합계 삭제"""
+        for totals, days in ((self.daily, self.daily_days), (self.hourly, self.hourly_days)):
+            cutoff = datetime.fromtimestamp(now - days * 86400).strftime('%Y-%m-%d')
+            for key in [key for key in totals if key[:10] < cutoff]:
+                del totals[key]
+
+    @staticmethod
+    def _sparse(totals):
+        """0 이 아닌 자세만 {자세 번호: 초} 로"""
+        return {str(posture): float(totals[posture]) for posture in np.flatnonzero(totals)}
+
+    def _dense(self, totals):
+        array = np.zeros(self.POSTURE_SLOTS)
+        if isinstance(totals, dict):
+            for posture, seconds in totals.items():
+                array[int(posture)] = seconds
+        else:
+            array[:len(totals)] = totals  # 예전 형식 (256 칸 목록)
+        return array
+
+    def to_dict(self):
+        return {
+            'daily': {day: self._sparse(totals) for day, totals in self.daily.items()},
+            'hourly': {hour: self._sparse(totals) for hour, totals in self.hourly.items()},
+        }
+
+    def save(self, path):
+        """임시 파일에 쓴 뒤 교체 (주기적으로 저장하므로 쓰는 도중 종료되어도 기존 파일 유지)"""
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path, **options):
+        sessionizer = cls(**options)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return sessionizer
+        sessionizer.daily = {day: sessionizer._dense(totals) for day, totals in data['daily'].items()}
+        sessionizer.hourly = {hour: sessionizer._dense(totals) for hour, totals in data['hourly'].items()}
+        sessionizer.prune(datetime.now().timestamp())
+        return sessionizer
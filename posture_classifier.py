@@ -0,0 +1,166 @@
+# 자세 분류 모듈
+# 특징 행렬 (n, k) 를 한 번의 벡터 연산으로 자세 번호 (n,) 로 분류한다.
+#
+# 모델 파일은 NumPy .npz 형식이며 'kind' 항목으로 분류기 종류를 구분한다.
+#   linear: mean, scale, weights (k, c), bias (c,), labels (c,)
+#   tree:   feature, threshold, left, right, value (트리별 노드 배열을 이어붙인 것),
+#           roots (트리별 루트 노드 번호), labels (c,)
+#
+# 녹화된 기록으로 정확도/처리량 측정:
+#   python posture_classifier.py model.npz posture_history   (날짜별 기록 폴더, 또는 .db/.bin 파일)
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from posture_analysis import feature_vectors
+
+
+class LinearClassifier:
+    """표준화 후 선형 점수의 argmax 로 분류"""
+
+    kind = 'linear'
+
+    def __init__(self, mean, scale, weights, bias, labels):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.labels = np.asarray(labels)
+
+    def predict(self, vectors):
+        scores = ((vectors - self.mean) / self.scale) @ self.weights + self.bias
+        return self.labels[scores.argmax(axis=1)]
+
+    def arrays(self):
+        return {'mean': self.mean, 'scale': self.scale, 'weights': self.weights,
+                'bias': self.bias, 'labels': self.labels}
+
+
+class TreeEnsembleClassifier:
+    """결정 트리 앙상블 (노드 배열 기반, 배치 전체를 깊이 단위로 동시에 탐색)
+
+    잎 노드는 left == -1 이며 value 에 클래스별 점수를 가진다.
+    """
+
+    kind = 'tree'
+
+    def __init__(self, feature, threshold, left, right, value, roots, labels):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.labels = np.asarray(labels)
+
+    def predict(self, vectors):
+        rows = np.arange(len(vectors))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(vectors), len(self.roots))).copy()
+        while True:
+            internal = self.left[nodes] >= 0
+            if not internal.any():
+                break
+            go_left = vectors[rows, self.feature[nodes]] <= self.threshold[nodes]
+            children = np.where(go_left, self.left[nodes], self.right[nodes])
+            nodes = np.where(internal, children, nodes)
+        scores = self.value[nodes].sum(axis=1)
+        return self.labels[scores.argmax(axis=1)]
+
+    def arrays(self):
+        return {'feature': self.feature, 'threshold': self.threshold, 'left': self.left,
+                'right': self.right, 'value': self.value, 'roots': self.roots,
+                'labels': self.labels}
+
+
+CLASSIFIERS = {
+    LinearClassifier.kind: LinearClassifier,
+    TreeEnsembleClassifier.kind: TreeEnsembleClassifier,
+}
+
+
+def load_classifier(path):
+    """모델 파일 로드"""
+    with np.load(path, allow_pickle=False) as data:
+        kind = str(data['kind'])
+        if kind not in CLASSIFIERS:
+            raise ValueError(f'알 수 없는 분류기 종류: {kind}')
+        arrays = {name: data[name] for name in data.files if name != 'kind'}
+    return CLASSIFIERS[kind](**arrays)
+
+
+def save_classifier(classifier, path):
+    np.savez(path, kind=classifier.kind, **classifier.arrays())
+
+
+def fit_linear_classifier(vectors, labels):
+    """최소제곱 one-vs-rest 선형 분류기 학습"""
+    classes = np.unique(labels)
+    mean = vectors.mean(axis=0)
+    scale = vectors.std(axis=0)
+    scale[scale == 0] = 1.0
+    design = np.hstack([(vectors - mean) / scale, np.ones((len(vectors), 1))])
+    targets = (labels[:, None] == classes[None, :]).astype(np.float64)
+    solution, *_ = np.linalg.lstsq(design, targets, rcond=None)
+    return LinearClassifier(mean, scale, solution[:-1], solution[-1], classes)
+
+
+def classify_features(classifier, features):
+    """특징 구조체 배열 (또는 저장된 기록 배열) 분류"""
+    return classifier.predict(feature_vectors(features))
+
+
+def benchmark(classifier, records, repeat=5):
+    """저장된 기록으로 정확도(기록된 자세 대비)와 샘플당 분류 시간 측정"""
+    vectors = feature_vectors(records)
+    labels = records['posture']
+    predicted = classifier.predict(vectors)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        classifier.predict(vectors)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    return {
+        'samples': len(records),
+        'accuracy': float((predicted == labels).mean()) if len(records) else 0.0,
+        'us_per_sample': elapsed / max(len(records), 1) * 1e6,
+    }
+
+
+def open_store(path):
+    """기록 폴더(날짜별 조각) 또는 예전 단일 저장소 파일 열기"""
+    from posture_storage import RecordLog, RecordDatabase, DayPartitionedStore
+
+    if os.path.isdir(path):
+        names = os.listdir(path)
+        segment = 'log' if any(name.endswith('.bin') for name in names) and \
+            not any(name.endswith('.db') for name in names) else 'sqlite'
+        return DayPartitionedStore(path, segment)
+    return RecordDatabase(path) if path.endswith('.db') else RecordLog(path)
+
+
+def main(argv):
+    if len(argv) < 3:
+        print('사용법: python posture_classifier.py model.npz posture_history')
+        return 1
+    model_path, stats_path = argv[1], argv[2]
+    if not os.path.exists(stats_path):
+        print(f'기록을 찾을 수 없습니다: {stats_path}')
+        return 1
+
+    store = open_store(stats_path)
+    records = store.read(0, len(store))
+    store.close()
+
+    result = benchmark(load_classifier(model_path), records)
+    print(f'샘플 수: {result["samples"]}')
+    print(f'정확도: {result["accuracy"] * 100:.1f}%')
+    print(f'분류 시간: {result["us_per_sample"]:.3f} us/샘플')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
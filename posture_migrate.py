@@ -0,0 +1,317 @@
+# 예전 posture_stats.json 기록 이전 도구
+# 파일 전체를 json.load 로 읽지 않고 배열 원소를 하나씩 읽어 날짜별 저장소에 일괄 추가한다.
+#
+# 빌드마다 다른 기록 형식:
+#   noline_color.py, test11~16: {'time', 'status', 'pressure'}  (총 압력만 있음)
+#   예전 test21.py:             {'time', 'status', 'sensor_values', 'predicted_posture'}
+#   현재 test21.py:             {'timestamp', 'values', 'predicted_posture', 'features'}
+#
+# 진행 상황을 <원본>.migrate 에 남기므로 중간에 끊겨도 다시 실행하면 이어서 옮긴다.
+# 비정상 종료로 끝이 잘린 파일은 온전한 원소까지 옮기고 'truncated' 로 표시한다.
+#   python posture_migrate.py posture_stats.json posture_history [sqlite|log]
+
+import os
+import re
+import sys
+import json
+import time
+import codecs
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from posture_storage import (RECORD_DTYPE, SENSOR_NAMES, FEATURE_FIELDS, DayPartitionedStore,
+                             parse_sensor_string, file_date)
+
+# 총 압력만 남은 형식은 자세 번호가 없으므로 상태로 대신함 (posture_status 와 같은 판정)
+# (0 은 미착석이므로 바른 자세는 1)
+STATUS_POSTURES = {'양호': 1, '불량': 255}
+ROLLOVER_SECONDS = 12 * 3600  # 시각이 이만큼 넘게 뒤로 가면 다음 날로 봄
+TIME_PATTERN = re.compile(rb'"time"\s*:\s*"(\d{1,2}):(\d{2}):(\d{2})"')
+
+
+class JsonArrayReader:
+    """JSON 배열 파일의 원소를 하나씩 읽음
+
+    tell() 은 다음 원소의 바이트 위치이며, 그 위치를 offset 으로 주면
+    거기서부터 이어 읽는다. 파일이 배열 중간에서 끝나면 (쓰다가 종료된 파일)
+    온전한 원소까지만 내고 truncated 를 True 로 둔다. 파일 중간이 깨졌으면
+    ValueError.
+    """
+
+    SEPARATORS = ' \t\r\n,'
+
+    def __init__(self, path, offset=0, chunk_size=1 << 20):
+        self.file = open(path, 'rb')
+        self.started = offset > 0  # 이어 읽을 때는 '[' 다음부터
+        if offset == 0 and self.file.read(3) == codecs.BOM_UTF8:
+            offset = 3
+        self.file.seek(offset)
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.reader = codecs.getincrementaldecoder('utf-8')()
+        self.text, self.pos, self.base = '', 0, offset
+        self.eof = False
+        self.truncated = False
+
+    def _fill(self):
+        data = self.file.read(self.chunk_size)
+        self.base += len(self.text[:self.pos].encode('utf-8'))
+        self.text = self.text[self.pos:] + self.reader.decode(data, final=not data)
+        self.pos = 0
+        self.eof = not data
+
+    def tell(self):
+        return self.base + len(self.text[:self.pos].encode('utf-8'))
+
+    def __iter__(self):
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in self.SEPARATORS:
+                self.pos += 1
+            if self.pos == len(self.text):
+                if self.eof:
+                    self.truncated = self.started
+                    return
+                self._fill()
+                continue
+            if not self.started:
+                if self.text[self.pos] != '[':
+                    raise ValueError('JSON 배열 파일이 아닙니다')
+                self.pos += 1
+                self.started = True
+                continue
+            if self.text[self.pos] == ']':
+                return
+            try:
+                item, end = self.decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    self.truncated = True  # 마지막 원소가 쓰다 만 채로 끝남
+                    return
+                if len(self.text) - self.pos > self.chunk_size:
+                    raise  # 한 묶음을 더 읽어도 안 되면 잘린 것이 아니라 깨진 것
+                self._fill()  # 원소가 읽은 범위 끝에서 잘림
+                continue
+            if end == len(self.text) and not self.eof:
+                self._fill()  # 숫자 등은 잘린 채로도 읽히므로 뒤를 더 읽고 다시
+                continue
+            self.pos = end
+            yield item
+
+    def close(self):
+        self.file.close()
+
+
+def count_day_rollovers(path, chunk_size=1 << 22):
+    """'time' 시각이 날짜를 넘어간 횟수 (시각만 저장된 기록의 첫 날짜 계산용)"""
+    rollovers, last, carry = 0, None, b''
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                return rollovers
+            data = carry + data
+            end = 0
+            for match in TIME_PATTERN.finditer(data):
+                clock = int(match[1]) * 3600 + int(match[2]) * 60 + int(match[3])
+                if last is not None and last - clock > ROLLOVER_SECONDS:
+                    rollovers += 1
+                last, end = clock, match.end()
+            carry = data[max(end, len(data) - 64):]  # 경계에 걸친 항목
+
+
+def checkpoint_path(source):
+    return source + '.migrate'
+
+
+def _source_state(source):
+    stat = os.stat(source)
+    return {'source_size': stat.st_size, 'source_mtime': stat.st_mtime}
+
+
+def _load_checkpoint(source):
+    """이어서 옮길 상태 (처음이면 새로 만듦)"""
+    try:
+        with open(checkpoint_path(source), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+    if state is not None:
+        if {key: state[key] for key in _source_state(source)} != _source_state(source):
+            raise ValueError(f'이전 후 원본 파일이 바뀌었습니다. {checkpoint_path(source)} 를 확인하세요')
+        state.setdefault('truncated', False)
+        return state
+    # 시각만 저장된 기록은 파일 수정 날짜가 마지막 기록의 날짜
+    first_day = file_date(source) - timedelta(days=count_day_rollovers(source))
+    state = {'offset': 0, 'rows': 0, 'skipped': 0,
+             'start_date': first_day.isoformat(), 'day_offset': 0, 'last_clock': None,
+             'variants': {}, 'done': False, 'truncated': False}
+    state.update(_source_state(source))
+    return state
+
+
+def _save_checkpoint(source, state):
+    path = checkpoint_path(source)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+
+
+def stat_variant(stat):
+    """기록 형식 이름 (알 수 없으면 None)"""
+    if 'timestamp' in stat and 'values' in stat:
+        return 'current'
+    if 'time' in stat and 'sensor_values' in stat:
+        return 'sensor_values'
+    if 'time' in stat and 'pressure' in stat:
+        return 'pressure'
+    return None
+
+
+class _Batch:
+    """이전할 기록을 모아 구조체 배열로 만듦"""
+
+    def __init__(self):
+        self.timestamps, self.values, self.postures, self.features = [], [], [], []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def add(self, timestamp_ms, values, posture, features=None):
+        self.timestamps.append(timestamp_ms)
+        self.values.append(values)
+        self.postures.append(posture)
+        self.features.append(features or [0.0] * len(FEATURE_FIELDS))
+
+    def records(self):
+        records = np.zeros(len(self.timestamps), dtype=RECORD_DTYPE)
+        records['timestamp'] = self.timestamps
+        records['values'] = np.clip(np.rint(np.asarray(self.values, dtype=np.float64)), 0, 65535)
+        records['posture'] = self.postures
+        features = np.asarray(self.features, dtype=np.float64)
+        for i, name in enumerate(FEATURE_FIELDS):
+            records[name] = features[:, i]
+        return records
+
+
+def migrate_legacy_stats(source, store, batch_size=50000, progress=None):
+    """예전 JSON 기록 파일을 저장소로 이전하고 결과 요약을 반환
+
+    batch_size 개마다 저장소를 flush 한 뒤 체크포인트를 남기고, 다시 실행하면
+    체크포인트의 파일 위치부터 이어 읽는다 (flush 와 체크포인트 사이에 끊기면
+    그 묶음이 한 번 더 들어갈 수 있다). 끝이 잘린 파일은 읽은 데까지 옮기고
+    결과의 truncated 가 True 가 된다. 파일 중간이 깨졌으면 그 앞까지 저장한
+    뒤 ValueError.
+    progress(rows, done_bytes, total_bytes) 는 체크포인트마다 호출된다.
+    """
+    state = _load_checkpoint(source)
+    total_bytes = state['source_size']
+    started = time.perf_counter()
+    if state['done']:
+        return dict(state, seconds=0.0, rows_per_second=0.0)
+
+    first_day = datetime.strptime(state['start_date'], '%Y-%m-%d').date()
+    day_offset, last_clock = state['day_offset'], state['last_clock']
+    variants = state['variants']
+    new_rows = 0
+    batch = _Batch()
+
+    def commit(reader_position):
+        nonlocal batch, new_rows
+        if len(batch):
+            store.extend(batch.records())
+            store.flush()
+            new_rows += len(batch)
+        state.update(offset=reader_position, day_offset=day_offset, last_clock=last_clock)
+        state['rows'] += len(batch)
+        _save_checkpoint(source, state)
+        batch = _Batch()
+        if progress is not None:
+            progress(state['rows'], reader_position, total_bytes)
+
+    reader = JsonArrayReader(source, state['offset'])
+    try:
+        for stat in reader:
+            variant = stat_variant(stat) if isinstance(stat, dict) else None
+            try:
+                if variant == 'current':
+                    timestamp = int(stat['timestamp'])
+                    values = stat['values']
+                    posture = int(stat.get('predicted_posture', 0))
+                    features = list(stat.get('features', []))[:len(FEATURE_FIELDS)]
+                    features += [0.0] * (len(FEATURE_FIELDS) - len(features))
+                elif variant is not None:
+                    hours, minutes, seconds = (int(part) for part in stat['time'].split(':'))
+                    clock = hours * 3600 + minutes * 60 + seconds
+                    if last_clock is not None and last_clock - clock > ROLLOVER_SECONDS:
+                        day_offset += 1
+                    last_clock = clock
+                    day = first_day + timedelta(days=day_offset)
+                    timestamp = int(datetime(day.year, day.month, day.day, hours, minutes,
+                                             seconds).timestamp() * 1000)
+                    features = None
+                    if variant == 'sensor_values':
+                        values = parse_sensor_string(stat['sensor_values'])
+                        posture = int(stat.get('predicted_posture', 0))
+                    else:
+                        # 센서별 값이 없으므로 총 압력을 고르게 나눔 (합계는 유지)
+                        values = [float(stat['pressure']) / len(SENSOR_NAMES)] * len(SENSOR_NAMES)
+                        posture = STATUS_POSTURES.get(stat.get('status'), 255)
+                else:
+                    raise ValueError('알 수 없는 형식')
+            except (KeyError, TypeError, ValueError):
+                state['skipped'] += 1
+                continue
+
+            variants[variant] = variants.get(variant, 0) + 1
+            batch.add(timestamp, values, posture, features)
+            if len(batch) >= batch_size:
+                commit(reader.tell())
+    except ValueError:
+        commit(reader.tell())  # 깨진 곳 앞까지는 저장
+        raise
+    else:
+        state.update(done=True, truncated=reader.truncated)
+        commit(reader.tell())
+    finally:
+        reader.close()
+
+    seconds = time.perf_counter() - started
+    return dict(state, seconds=seconds, rows_per_second=new_rows / seconds if seconds else 0.0)
+
+
+def main(argv):
+    if len(argv) < 3:
+        print('사용법: python posture_migrate.py posture_stats.json posture_history [sqlite|log]')
+        return 1
+    source, directory = argv[1], argv[2]
+    segment = argv[3] if len(argv) > 3 else 'sqlite'
+
+    started = time.perf_counter()
+
+    def report(rows, done_bytes, total_bytes):
+        elapsed = time.perf_counter() - started
+        print(f'{rows}개 ({done_bytes / max(total_bytes, 1) * 100:.1f}%), '
+              f'{rows / elapsed if elapsed else 0:.0f}행/초')
+
+    store = DayPartitionedStore(directory, segment)
+    try:
+        result = migrate_legacy_stats(source, store, progress=report)
+    except (OSError, ValueError) as e:
+        print(f'이전 실패: {e}')
+        return 1
+    finally:
+        store.close()
+    print(f'이전한 기록: {result["rows"]}개 (건너뜀 {result["skipped"]}개)')
+    if result['truncated']:
+        print('원본 파일 끝이 잘려 있어 마지막 온전한 기록까지 옮겼습니다.')
+    for variant, count in result['variants'].items():
+        print(f'  {variant}: {count}개')
+    print(f'처리 속도: {result["rows_per_second"]:.0f}행/초 ({result["seconds"]:.1f}초)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,1778 @@
+# 자세 기록 저장 모듈
+# 샘플 하나를 51바이트 구조체(시간, 16개 센서값, 예측 자세, 자세 특징)로 보관한다.
+
+import os
+import csv
+import json
+import time
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+SENSOR_NAMES = [f'A{i}' for i in range(1, 17)]
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<i8'),               # epoch 밀리초
+    ('values', '<u2', (len(SENSOR_NAMES),)),
+    ('posture', 'u1'),
+    # 자세 특징 (posture_analysis.extract_features 결과 중 저장 항목)
+    ('cop_x', '<f2'),
+    ('cop_y', '<f2'),
+    ('lr_balance', '<f2'),
+    ('fb_balance', '<f2'),
+    ('contact', 'u1'),
+    ('peak', 'u1'),
+])
+
+FEATURE_FIELDS = ['cop_x', 'cop_y', 'lr_balance', 'fb_balance', 'contact', 'peak']
+
+
+GOOD_POSTURES = (0, 1)
+
+
+def posture_status(posture):
+    """예측 자세 번호를 상태 문자열로 변환"""
+    return '양호' if posture in GOOD_POSTURES else '불량'
+
+
+def make_record(timestamp, values, posture, features=None):
+    """단일 기록 생성 (timestamp 는 epoch 초)"""
+    record = np.zeros((), dtype=RECORD_DTYPE)
+    record['timestamp'] = int(round(timestamp * 1000))
+    record['values'] = np.clip(np.rint(values), 0, 65535)
+    record['posture'] = posture
+    if features is not None:
+        for name in FEATURE_FIELDS:
+            record[name] = features[name]
+    return record
+
+
+def format_time(timestamp_ms, fmt='%H:%M:%S'):
+    return datetime.fromtimestamp(timestamp_ms / 1000).strftime(fmt)
+
+
+def day_bounds(day):
+    """'YYYY-MM-DD' 하루의 [시작, 끝) epoch 초 (지역 시간 기준)"""
+    start = datetime.strptime(day, '%Y-%m-%d')
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+
+def split_by_day(timestamps):
+    """시간 순서로 정렬된 epoch 밀리초 배열을 날짜별 (날짜, 시작, 끝) 구간으로 나눔"""
+    start = 0
+    while start < len(timestamps):
+        day = format_time(int(timestamps[start]), '%Y-%m-%d')
+        day_end = day_bounds(day)[1]
+        stop = int(np.searchsorted(timestamps, int(day_end * 1000), 'left'))
+        yield day, start, stop
+        start = stop
+
+
+def format_timestamps(timestamps):
+    """epoch 밀리초 배열을 'YYYY-MM-DD HH:MM:SS' 지역 시간 문자열 목록으로 변환
+
+    처음과 끝의 시차가 같으면 (서머타임 전환이 없으면) 한 번에 변환한다.
+    """
+    if len(timestamps) == 0:
+        return []
+    offsets = [datetime.fromtimestamp(int(ts) / 1000).astimezone().utcoffset()
+               for ts in (timestamps[0], timestamps[-1])]
+    if offsets[0] != offsets[1]:
+        return [format_time(ts, '%Y-%m-%d %H:%M:%S') for ts in timestamps.tolist()]
+    local = (timestamps // 1000 + int(offsets[0].total_seconds())).astype('datetime64[s]')
+    return np.char.replace(np.datetime_as_string(local), 'T', ' ').tolist()
+
+
+def format_sensor_values(values):
+    """표시용 센서값 문자열 ('A1: 12, A2: ...')"""
+    return ', '.join(f'{name}: {value}' for name, value in zip(SENSOR_NAMES, values.tolist()))
+
+
+def format_record(record):
+    """표시/내보내기용 (시간, 상태, 압력값, 예측 자세) 문자열 튜플"""
+    posture = int(record['posture'])
+    return (
+        format_time(int(record['timestamp'])),
+        posture_status(posture),
+        format_sensor_values(record['values']),
+        str(posture),
+    )
+
+
+def parse_sensor_string(text):
+    """'A1: 12.0, A2: ...' 형식 문자열을 센서값 배열로 변환"""
+    values = np.zeros(len(SENSOR_NAMES))
+    index = {name: i for i, name in enumerate(SENSOR_NAMES)}
+    for part in text.split(','):
+        name, _, value = part.partition(':')
+        name = name.strip()
+        if name in index:
+            values[index[name]] = float(value)
+    return values
+
+
+def record_to_json(record):
+    return {
+        'timestamp': int(record['timestamp']),
+        'values': record['values'].tolist(),
+        'predicted_posture': int(record['posture']),
+        'features': [float(record[name]) for name in FEATURE_FIELDS],
+    }
+
+
+def record_from_json(stat, default_date=None):
+    """저장된 JSON 기록을 구조체로 변환 (예전 문자열 형식도 처리)"""
+    if 'timestamp' in stat:
+        record = np.zeros((), dtype=RECORD_DTYPE)
+        record['timestamp'] = stat['timestamp']
+        record['values'] = stat['values']
+        record['posture'] = stat.get('predicted_posture', 0)
+        for name, value in zip(FEATURE_FIELDS, stat.get('features', [])):
+            record[name] = value
+        return record
+
+    # 예전 형식: 시:분:초 문자열과 센서값 문자열
+    default_date = default_date or datetime.now().date()
+    clock = datetime.strptime(stat['time'], '%H:%M:%S').time()
+    timestamp = datetime.combine(default_date, clock).timestamp()
+    values = parse_sensor_string(stat.get('sensor_values', ''))
+    return make_record(timestamp, values, stat.get('predicted_posture', 0))
+
+
+def file_date(path):
+    """파일 수정 날짜 (시간만 저장된 예전 기록의 날짜로 사용)"""
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(path)).date()
+    except OSError:
+        return datetime.now().date()
+
+
+EXPORT_COLUMNS = ['시간', '자세 상태'] + SENSOR_NAMES + ['예측 자세']
+
+
+def iter_export(store, start=None, end=None, posture=None, chunk_size=50000):
+    """내보낼 기록을 chunk_size 개 위치 범위 단위로 스트리밍
+
+    store 는 날짜별 저장소 (또는 그 위의 RecordHistory). 시간은 epoch 초.
+    하루 전체를 한 번에 조회하지 않고 날짜의 위치 범위를 read() 로 나눠 읽은 뒤
+    시간/자세 조건으로 거르므로, 메모리 사용량은 기록 수와 관계없이 일정하다.
+    (기록, 지금까지 훑은 기록 수, 전체 기록 수) 를 반환한다.
+    """
+    spans = []
+    for day in store.days():
+        day_start, day_end = day_bounds(day)
+        if (start is None or start < day_end) and (end is None or end > day_start):
+            first, last = store.day_range(day)
+            spans.append((day, last - first))
+    total = sum(count for _, count in spans)
+    done = 0
+    for day, count in spans:
+        for chunk_start in range(0, count, chunk_size):
+            records = store.read_day(day, chunk_start, chunk_start + chunk_size)
+            done += len(records)
+            timestamps = records['timestamp']
+            keep = np.ones(len(records), dtype=bool)
+            if start is not None:
+                keep &= timestamps >= int(start * 1000)
+            if end is not None:
+                keep &= timestamps < int(end * 1000)
+            if posture is not None:
+                keep &= records['posture'] == posture
+            yield records[keep], done, total
+
+
+def export_csv(store, path, start=None, end=None, posture=None, progress=None, cancel=None):
+    """기록을 센서별 열로 CSV 파일에 스트리밍 저장
+
+    progress(done, total) 는 묶음 하나를 쓸 때마다 호출되고, cancel() 이 참이면
+    중단하고 쓰던 파일을 지운다. 저장한 행 수를 반환 (취소되면 None).
+    """
+    rows = 0
+    # Excel 에서 한글이 깨지지 않도록 BOM 을 붙임
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for records, done, total in iter_export(store, start, end, posture):
+            if cancel is not None and cancel():
+                break
+            statuses = np.where(np.isin(records['posture'], GOOD_POSTURES), '양호', '불량')
+            writer.writerows(
+                [time_text, status, *values, posture_number]
+                for time_text, status, values, posture_number in zip(
+                    format_timestamps(records['timestamp']), statuses.tolist(),
+                    records['values'].tolist(), records['posture'].tolist()))
+            rows += len(records)
+            if progress is not None:
+                progress(done, total)
+        else:
+            return rows
+    os.remove(path)
+    return None
+
+
+COLUMNAR_FORMAT = 'posture-columnar'
+COLUMNAR_VERSION = 1
+NPY_HEADER_SIZE = 128  # 행 수를 나중에 채울 수 있도록 .npy 헤더 길이를 고정
+
+
+def _npy_header(dtype, shape):
+    """고정 길이 .npy (1.0) 헤더"""
+    header = repr({'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                   'fortran_order': False, 'shape': tuple(shape)})
+    header = header.ljust(NPY_HEADER_SIZE - 11) + '\n'
+    return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+
+class ColumnarWriter:
+    """표 하나를 열마다 .npy 파일 하나로 묶음 단위 스트리밍 저장
+
+    각 파일은 헤더 자리를 비워두고 데이터를 이어 쓴 뒤, close() 에서 최종 행
+    수로 헤더를 채운다. 결과는 np.load(mmap_mode='r') 로 바로 매핑할 수 있다.
+    """
+
+    def __init__(self, directory, table, columns):
+        # columns: {열 이름: (dtype, 행 하나의 모양)}
+        self.directory = directory
+        self.table = table
+        self.columns = columns
+        self.rows = 0
+        self.files = {}
+        for name, (dtype, inner) in columns.items():
+            f = open(self._path(name), 'wb')
+            f.write(_npy_header(dtype, (0,) + tuple(inner)))
+            self.files[name] = f
+
+    def _path(self, name):
+        return os.path.join(self.directory, f'{self.table}_{name}.npy')
+
+    def write(self, chunk):
+        """열 이름 -> 배열 (행 수가 같은) 묶음 하나 추가"""
+        count = None
+        for name, (dtype, _) in self.columns.items():
+            data = np.ascontiguousarray(chunk[name], dtype=dtype)
+            data.tofile(self.files[name])
+            count = len(data)
+        self.rows += count or 0
+
+    def close(self):
+        """헤더에 최종 행 수를 쓰고 스키마 항목 반환"""
+        schema = {'rows': self.rows, 'columns': {}}
+        for name, (dtype, inner) in self.columns.items():
+            f = self.files[name]
+            f.seek(0)
+            f.write(_npy_header(dtype, (self.rows,) + tuple(inner)))
+            f.close()
+            schema['columns'][name] = {'file': os.path.basename(self._path(name)),
+                                       'dtype': np.dtype(dtype).str, 'shape': list(inner)}
+        return schema
+
+
+def export_columnar(store, archive, directory, start=None, end=None, posture=None,
+                    progress=None, cancel=None):
+    """기록(특징, 자세)과 원본 프레임을 열 단위 .npy 파일과 schema.json 으로 저장
+
+    자세 조건은 기록에만 적용된다 (원본 프레임에는 자세가 없음).
+    progress/cancel 은 export_csv 와 같다. 저장한 (기록 수, 프레임 수) 를 반환
+    (취소되면 None). 같은 폴더 옆의 임시 폴더에 쓴 뒤 끝나면 옮기므로, 취소하거나
+    실패해도 대상 폴더에 원래 있던 파일은 건드리지 않는다.
+    """
+    target = os.path.abspath(directory)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    directory = tempfile.mkdtemp(prefix=f'.{os.path.basename(target)}-', dir=os.path.dirname(target))
+    try:
+        result = _write_columnar(store, archive, directory, start, end, posture, progress, cancel)
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    if result is None:
+        shutil.rmtree(directory, ignore_errors=True)
+        return None
+    if not os.path.exists(target):
+        os.replace(directory, target)
+        return result
+    # 이미 있는 폴더: 같은 이름의 파일만 덮어씀
+    for name in os.listdir(directory):
+        os.replace(os.path.join(directory, name), os.path.join(target, name))
+    os.rmdir(directory)
+    return result
+
+
+def _write_columnar(store, archive, directory, start, end, posture, progress, cancel):
+    """export_columnar 의 실제 쓰기 (directory 는 비어 있는 임시 폴더)"""
+    sensors = (len(SENSOR_NAMES),)
+    records_writer = ColumnarWriter(directory, 'records', {
+        'timestamp': ('<i8', ()), 'values': ('<u2', sensors), 'posture': ('u1', ()),
+        **{name: (RECORD_DTYPE[name].str, ()) for name in FEATURE_FIELDS}})
+    frames_writer = ColumnarWriter(directory, 'frames', {
+        'timestamp': ('<i8', ()), 'values': ('<u2', sensors)})
+
+    frame_spans = list(archive.iter_range(start, end))
+    frame_total = sum(len(timestamps) for timestamps, _ in frame_spans)
+    cancelled = False
+    record_total = 0
+    for records, done, record_total in iter_export(store, start, end, posture):
+        if cancel is not None and cancel():
+            cancelled = True
+            break
+        records_writer.write(records)
+        if progress is not None:
+            progress(done, record_total + frame_total)
+
+    frames_done = 0
+    chunk_size = 1 << 20
+    for timestamps, values in ([] if cancelled else frame_spans):
+        for first in range(0, len(timestamps), chunk_size):
+            if cancel is not None and cancel():
+                cancelled = True
+                break
+            frames_writer.write({'timestamp': timestamps[first:first + chunk_size],
+                                 'values': values[first:first + chunk_size]})
+            frames_done += len(timestamps[first:first + chunk_size])
+            if progress is not None:
+                progress(record_total + frames_done, record_total + frame_total)
+        if cancelled:
+            break
+
+    schema = {
+        'format': COLUMNAR_FORMAT,
+        'version': COLUMNAR_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'start': start, 'end': end, 'posture': posture,
+        'time_unit': 'epoch_ms',
+        'sensors': SENSOR_NAMES,
+        'tables': {'records': records_writer.close(), 'frames': frames_writer.close()},
+    }
+    if cancelled:
+        return None
+    with open(os.path.join(directory, 'schema.json'), 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    return schema['tables']['records']['rows'], schema['tables']['frames']['rows']
+
+
+def load_columnar(directory):
+    """export_columnar 결과를 {표: {열: 메모리 매핑 배열}} 로 열기"""
+    with open(os.path.join(directory, 'schema.json'), 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    if schema.get('format') != COLUMNAR_FORMAT:
+        raise ValueError(f'알 수 없는 형식: {schema.get("format")}')
+    return {table: {name: np.load(os.path.join(directory, column['file']), mmap_mode='r')
+                    for name, column in info['columns'].items()}
+            for table, info in schema['tables'].items()}
+
+
+class RecordBuffer:
+    """구조체 배열 기반의 증가형 기록 버퍼"""
+
+    def __init__(self, records=None, capacity=1024, dtype=RECORD_DTYPE):
+        self.dtype = dtype
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._size = 0
+        if records is not None:
+            self.extend(records)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __iter__(self):
+        return iter(self.records)
+
+    @property
+    def records(self):
+        """저장된 기록 배열 (복사 없는 뷰)"""
+        return self._data[:self._size]
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= len(self._data):
+            return
+        capacity = max(needed, len(self._data) * 2)
+        data = np.zeros(capacity, dtype=self.dtype)
+        data[:self._size] = self.records
+        self._data = data
+
+    def append(self, record):
+        self._reserve(1)
+        self._data[self._size] = record
+        self._size += 1
+
+    def extend(self, records):
+        records = np.asarray(records, dtype=self.dtype)
+        self._reserve(len(records))
+        self._data[self._size:self._size + len(records)] = records
+        self._size += len(records)
+
+    def clear(self):
+        self._data = np.zeros(1024, dtype=self.dtype)
+        self._size = 0
+
+    def nbytes(self):
+        return self.records.nbytes
+
+
+def load_appended(path, dtype):
+    """추가만 하는 파일을 읽음 (쓰는 도중 끊긴 마지막 행은 잘라냄, 파일이 없으면 None)
+
+    잘라내지 않으면 이후 추가한 행이 모두 어긋난 위치에 쓰인다.
+    """
+    dtype = np.dtype(dtype)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    count, extra = divmod(size, dtype.itemsize)
+    if extra:
+        with open(path, 'r+b') as f:
+            f.truncate(count * dtype.itemsize)
+    return np.fromfile(path, dtype=dtype)
+
+
+class RecordLog:
+    """기록을 파일 끝에 추가만 하는 이진 로그
+
+    append() 는 메모리 버퍼에 모았다가 flush_every 개가 모이거나
+    flush_interval 초가 지나면 한 번에 파일 끝에 쓴다. 샘플당 저장 비용은
+    전체 기록 길이와 무관하며, 쓰는 도중 종료되어도 마지막 미완성 기록만
+    버려진다.
+    """
+
+    def __init__(self, path, flush_every=100, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = RecordBuffer(capacity=flush_every)
+        self.last_flush = time.monotonic()
+        self.flushed_count = self._repair()
+
+    def _repair(self):
+        """중간에 끊긴 마지막 기록을 잘라내고 온전한 기록 수 반환"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        count, extra = divmod(size, RECORD_DTYPE.itemsize)
+        if extra:
+            with open(self.path, 'r+b') as f:
+                f.truncate(count * RECORD_DTYPE.itemsize)
+        return count
+
+    def __len__(self):
+        return self.flushed_count + len(self.pending)
+
+    def append(self, record):
+        self.pending.append(record)
+        if len(self.pending) >= self.flush_every or \
+                time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def extend(self, records):
+        """여러 기록을 한 번에 추가 (대량 적재용)"""
+        self.flush()
+        records = np.asarray(records, dtype=RECORD_DTYPE)
+        with open(self.path, 'ab') as f:
+            records.tofile(f)
+        self.flushed_count += len(records)
+
+    def flush(self):
+        if len(self.pending):
+            with open(self.path, 'ab') as f:
+                self.pending.records.tofile(f)
+            self.flushed_count += len(self.pending)
+            self.pending.clear()
+        self.last_flush = time.monotonic()
+
+    def sync(self):
+        """기록된 내용을 디스크에 동기화"""
+        self.sync_path(self.path)
+
+    @staticmethod
+    def sync_path(path):
+        """열려 있지 않아도 파일 경로만으로 동기화"""
+        if os.path.exists(path):
+            with open(path, 'ab') as f:
+                os.fsync(f.fileno())
+
+    def mapped(self):
+        """파일에 기록된 부분 (메모리 매핑, 읽기 전용)"""
+        if not self.flushed_count:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', shape=(self.flushed_count,))
+
+    def read(self, start, stop):
+        """[start, stop) 구간 기록 (아직 쓰지 않은 버퍼 포함)"""
+        start, stop = max(start, 0), min(stop, len(self))
+        parts = []
+        if start < self.flushed_count:
+            parts.append(np.array(self.mapped()[start:min(stop, self.flushed_count)]))
+        if stop > self.flushed_count:
+            parts.append(self.pending.records[max(start - self.flushed_count, 0):
+                                              stop - self.flushed_count].copy())
+        if not parts:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    def iter_chunks(self, chunk_size=10000):
+        """처음부터 끝까지 chunk_size 개씩 스트리밍"""
+        for start in range(0, len(self), chunk_size):
+            yield self.read(start, start + chunk_size)
+
+    def _time_range(self, start, end):
+        """[start, end) 시간 구간의 위치 범위 (기록은 시간 순서로 추가됨)"""
+        self.flush()
+        timestamps = self.mapped()['timestamp']
+        first = 0 if start is None else int(np.searchsorted(timestamps, int(start * 1000)))
+        last = len(timestamps) if end is None else int(np.searchsorted(timestamps, int(end * 1000)))
+        return first, last
+
+    def query(self, start=None, end=None, posture=None, status=None):
+        """시간 구간 (epoch 초) 과 자세/상태 조건에 맞는 기록"""
+        records = self.read(*self._time_range(start, end))
+        if posture is not None:
+            records = records[records['posture'] == posture]
+        if status is not None:
+            bad = ~np.isin(records['posture'], GOOD_POSTURES)
+            records = records[bad == (status == '불량')]
+        return records
+
+    def posture_counts(self, start=None, end=None):
+        """시간 구간의 자세별 샘플 수 (길이 256 배열)"""
+        first, last = self._time_range(start, end)
+        postures = self.mapped()['posture'][first:last]
+        return np.bincount(postures, minlength=256)
+
+    def clear(self):
+        self.pending.clear()
+        self.flushed_count = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        self.flush()
+
+
+class RecordDatabase:
+    """SQLite (WAL) 기반 기록 저장소
+
+    RecordLog 와 같은 방식으로 사용한다. append() 는 버퍼에 모았다가 한
+    트랜잭션으로 일괄 삽입하고, 시간/자세/상태 색인으로 날짜별 조회와 자세별
+    집계를 전체 기록을 읽지 않고 처리한다. 행 번호(id)는 1부터 연속이므로
+    위치 기반 조회도 기본 키 범위 탐색이 된다.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS records (
+            id INTEGER PRIMARY KEY,
+            timestamp INTEGER NOT NULL,
+            posture INTEGER NOT NULL,
+            status INTEGER NOT NULL,
+            sensor_values BLOB NOT NULL,
+            cop_x REAL, cop_y REAL, lr_balance REAL, fb_balance REAL,
+            contact INTEGER, peak INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS records_timestamp ON records (timestamp, posture);
+        CREATE INDEX IF NOT EXISTS records_posture ON records (posture, timestamp);
+        CREATE INDEX IF NOT EXISTS records_status ON records (status, timestamp);
+    '''
+
+    COLUMNS = 'timestamp, posture, sensor_values, cop_x, cop_y, lr_balance, fb_balance, contact, peak'
+
+    # SELECT 결과 행을 그대로 받는 구조체 (센서값은 32바이트 원본)
+    ROW_DTYPE = np.dtype([
+        ('timestamp', '<i8'),
+        ('posture', 'u1'),
+        ('sensor_values', f'S{RECORD_DTYPE["values"].itemsize}'),
+        ('cop_x', '<f8'),
+        ('cop_y', '<f8'),
+        ('lr_balance', '<f8'),
+        ('fb_balance', '<f8'),
+        ('contact', 'u1'),
+        ('peak', 'u1'),
+    ])
+
+    INSERT = ('INSERT INTO records (timestamp, posture, status, sensor_values, cop_x, cop_y, '
+              'lr_balance, fb_balance, contact, peak) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+
+    def __init__(self, path, flush_every=100, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = RecordBuffer(capacity=flush_every)
+        self.last_flush = time.monotonic()
+        # 저장 스레드와 GUI 스레드가 함께 쓰므로 연결을 잠금으로 보호
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(self.SCHEMA)
+        row = self.connection.execute('SELECT MAX(id) FROM records').fetchone()
+        self.flushed_count = row[0] or 0
+
+    def __len__(self):
+        return self.flushed_count + len(self.pending)
+
+    @staticmethod
+    def _rows(records):
+        """구조체 배열을 INSERT 매개변수 행으로 변환"""
+        bad = (~np.isin(records['posture'], GOOD_POSTURES)).astype(int).tolist()
+        values = [row.tobytes() for row in records['values']]
+        columns = [records['timestamp'].tolist(), records['posture'].tolist(), bad, values]
+        columns += [records[name].tolist() for name in FEATURE_FIELDS]
+        return zip(*columns)
+
+    def _decode(self, rows):
+        """SELECT 결과를 기록 구조체 배열로 변환"""
+        rows = np.array(rows, dtype=self.ROW_DTYPE)
+        records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+        records['values'] = np.frombuffer(rows['sensor_values'].tobytes(), dtype='<u2') \
+            .reshape(len(rows), -1)
+        for name in ('timestamp', 'posture') + tuple(FEATURE_FIELDS):
+            records[name] = rows[name]
+        return records
+
+    def append(self, record):
+        self.pending.append(record)
+        if len(self.pending) >= self.flush_every or \
+                time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def _insert(self, records):
+        with self.lock, self.connection:
+            self.connection.executemany(self.INSERT, self._rows(records))
+        self.flushed_count += len(records)
+
+    def _select(self, sql, params):
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def extend(self, records):
+        """여러 기록을 한 트랜잭션으로 추가 (대량 적재용)"""
+        self.flush()
+        self._insert(np.asarray(records, dtype=RECORD_DTYPE))
+
+    def flush(self):
+        if len(self.pending):
+            self._insert(self.pending.records)
+            self.pending.clear()
+        self.last_flush = time.monotonic()
+
+    def sync(self):
+        """WAL 내용을 데이터베이스 파일에 반영하고 디스크에 동기화"""
+        with self.lock:
+            self.connection.execute('PRAGMA wal_checkpoint(FULL)')
+
+    @staticmethod
+    def sync_path(path):
+        """별도 연결로 체크포인트 (열린 저장소의 잠금과 연결을 쓰지 않음)"""
+        try:
+            connection = sqlite3.connect(f'file:{path}?mode=rw', uri=True)
+        except sqlite3.OperationalError:
+            if os.path.exists(path):
+                raise
+            return  # 그 사이 삭제된 날짜
+        try:
+            connection.execute('PRAGMA wal_checkpoint(FULL)')
+        finally:
+            connection.close()
+
+    def read(self, start, stop):
+        """[start, stop) 구간 기록 (아직 쓰지 않은 버퍼 포함)"""
+        start, stop = max(start, 0), min(stop, len(self))
+        parts = []
+        if start < self.flushed_count:
+            rows = self._select(
+                f'SELECT {self.COLUMNS} FROM records WHERE id > ? AND id <= ? ORDER BY id',
+                (start, min(stop, self.flushed_count)))
+            parts.append(self._decode(rows))
+        if stop > self.flushed_count:
+            parts.append(self.pending.records[max(start - self.flushed_count, 0):
+                                              stop - self.flushed_count].copy())
+        if not parts:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    def iter_chunks(self, chunk_size=10000):
+        """처음부터 끝까지 chunk_size 개씩 스트리밍"""
+        for start in range(0, len(self), chunk_size):
+            yield self.read(start, start + chunk_size)
+
+    @staticmethod
+    def _where(start, end, posture=None, status=None):
+        clauses, params = [], []
+        if posture is not None:
+            clauses.append('posture = ?')
+            params.append(int(posture))
+        if status is not None:
+            clauses.append('status = ?')
+            params.append(int(status == '불량'))
+        if start is not None:
+            clauses.append('timestamp >= ?')
+            params.append(int(start * 1000))
+        if end is not None:
+            clauses.append('timestamp < ?')
+            params.append(int(end * 1000))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def query(self, start=None, end=None, posture=None, status=None):
+        """시간 구간 (epoch 초) 과 자세/상태 조건에 맞는 기록"""
+        self.flush()
+        where, params = self._where(start, end, posture, status)
+        rows = self._select(f'SELECT {self.COLUMNS} FROM records{where} ORDER BY timestamp', params)
+        return self._decode(rows)
+
+    def posture_counts(self, start=None, end=None):
+        """시간 구간의 자세별 샘플 수 (길이 256 배열)"""
+        self.flush()
+        where, params = self._where(start, end)
+        counts = np.zeros(256, dtype=np.int64)
+        for posture, count in self._select(
+                f'SELECT posture, COUNT(*) FROM records{where} GROUP BY posture', params):
+            counts[posture] = count
+        return counts
+
+    def clear(self):
+        self.pending.clear()
+        self.flushed_count = 0
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM records')
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.connection.close()
+
+
+class RecordHistory:
+    """기록 로그 위에 최근 hot_limit 개만 메모리에 두는 기록 관리자
+
+    모든 기록은 RecordLog (또는 RecordDatabase) 에 추가되고, 메모리에는 표시용 최근 구간만 남는다.
+    한도를 넘으면 오래된 기록을 spill_chunk 개 단위로 메모리에서 내린다
+    (이미 로그에 있으므로 따로 쓰지 않는다). 조회와 내보내기는 로그를 통해
+    한 배열처럼 사용한다. writer 를 주면 저장은 WriteBehindWriter 스레드가
+    맡고, 아직 기록되지 않은 최근 기록은 메모리 구간에서 읽는다.
+    """
+
+    def __init__(self, log, hot_limit=10000, spill_chunk=None, writer=None):
+        self.log = log
+        self.writer = writer
+        self.hot_limit = max(hot_limit, log.flush_every)
+        self.spill_chunk = spill_chunk or max(hot_limit // 4, 1)
+        # 시작할 때는 로그 끝부분만 읽음
+        self.hot = RecordBuffer(log.read(len(log) - self.hot_limit, len(log)))
+        self.cold_count = len(log) - len(self.hot)
+
+    def __len__(self):
+        return self.cold_count + len(self.hot)
+
+    def append(self, record):
+        """기록 추가. 메모리에서 내린 기록 수를 반환"""
+        if self.writer is not None:
+            self.writer.submit(self.log, record)
+        else:
+            self.log.append(record)
+        self.hot.append(record)
+        if len(self.hot) > self.hot_limit:
+            return self.spill(len(self.hot) - self.hot_limit + self.spill_chunk)
+        return 0
+
+    def spill(self, count):
+        """가장 오래된 count 개 기록을 메모리에서 내림"""
+        count = min(count, len(self.hot))
+        if count <= 0:
+            return 0
+        self.hot = RecordBuffer(self.hot.records[count:])
+        self.cold_count += count
+        return count
+
+    def read(self, start, stop):
+        """전체 기록 중 [start, stop) 구간 반환"""
+        start, stop = max(start, 0), min(stop, len(self))
+        logged = len(self.log)
+        if logged < self.cold_count:
+            # 메모리에서 이미 내린 기록이 아직 저장 대기 중이면 먼저 기록
+            self.writer.drain()
+            logged = len(self.log)
+        if stop <= logged:
+            return self.log.read(start, stop)
+        # 저장 대기 중인 기록은 메모리 구간에서 읽음
+        parts = [self.log.read(start, logged)] if start < logged else []
+        parts.append(self.hot.records[max(start, logged) - self.cold_count:
+                                      stop - self.cold_count].copy())
+        return np.concatenate(parts)
+
+    def iter_chunks(self, chunk_size=10000):
+        for start in range(0, len(self), chunk_size):
+            yield self.read(start, start + chunk_size)
+
+    def query(self, start=None, end=None, posture=None, status=None):
+        return self.log.query(start, end, posture, status)
+
+    def posture_counts(self, start=None, end=None):
+        return self.log.posture_counts(start, end)
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.drain()
+        self.log.flush()
+
+    def days(self):
+        return self.log.days()
+
+    def day_records(self, day):
+        """하루치 기록 전체"""
+        if self.writer is not None:
+            self.writer.drain()
+        return self.log.day_records(day)
+
+    def day_range(self, day):
+        if self.writer is not None:
+            self.writer.drain()
+        return self.log.day_range(day)
+
+    def read_day(self, day, start, stop):
+        return self.log.read_day(day, start, stop)
+
+    def refresh(self):
+        """다른 곳에서 로그에 기록을 넣은 뒤 (예전 기록 이전 등) 위치 다시 계산"""
+        if self.writer is not None:
+            self.writer.drain()
+        self.cold_count = len(self.log) - len(self.hot)
+
+    def drop_day(self, day):
+        """하루치 기록 삭제 (메모리 구간에서도 제거)"""
+        if self.writer is not None:
+            self.writer.drain()
+        self.log.drop_day(day)
+        start, end = day_bounds(day)
+        timestamps = self.hot.records['timestamp']
+        keep = (timestamps < int(start * 1000)) | (timestamps >= int(end * 1000))
+        self.hot = RecordBuffer(self.hot.records[keep])
+        self.cold_count = len(self.log) - len(self.hot)
+
+    def clear(self):
+        if self.writer is not None:
+            self.writer.drain()
+        self.hot.clear()
+        self.cold_count = 0
+        self.log.clear()
+
+
+class DayPartitionedStore:
+    """날짜별 조각으로 나눈 기록 저장소
+
+    하루치 기록은 directory/YYYY-MM-DD.bin (RecordLog) 또는 .db
+    (RecordDatabase) 조각 하나에 들어가고, catalog.json 에 날짜별 기록 수와
+    첫/마지막 시각을 둔다. 하루를 여는 것은 조각 하나를 읽는 것이고, 오래된
+    날짜는 조각 파일째로 삭제한다. 전체 위치 기반 조회는 날짜 순서로 이어붙인
+    것처럼 동작한다.
+    """
+
+    SEGMENTS = {'log': (RecordLog, '.bin'), 'sqlite': (RecordDatabase, '.db')}
+    CATALOG_FILE = 'catalog.json'
+    MAX_OPEN = 4  # 동시에 열어둘 조각 수
+
+    def __init__(self, directory, segment='sqlite', flush_every=100, flush_interval=5.0):
+        if segment not in self.SEGMENTS:
+            raise ValueError(f'알 수 없는 저장 방식: {segment}')
+        self.directory = directory
+        self.segment_class, self.suffix = self.SEGMENTS[segment]
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        # 저장 스레드와 GUI 스레드가 함께 쓰므로 잠금으로 보호
+        self.lock = threading.RLock()
+        self.segments = {}  # 열린 조각 (최근 사용 순)
+        os.makedirs(directory, exist_ok=True)
+        self.catalog = self._load_catalog()
+
+    def _path(self, day):
+        return os.path.join(self.directory, day + self.suffix)
+
+    def _load_catalog(self):
+        try:
+            with open(os.path.join(self.directory, self.CATALOG_FILE), 'r', encoding='utf-8') as f:
+                catalog = json.load(f)
+        except (OSError, ValueError):
+            catalog = {}
+        days = sorted(name[:-len(self.suffix)] for name in os.listdir(self.directory)
+                      if name.endswith(self.suffix))
+        catalog = {day: entry for day, entry in catalog.items() if day in days}
+        # 목록에 없는 조각과 마지막 날짜 (종료 직전 기록이 목록에 반영되지 않았을 수 있음)
+        for day in days:
+            if day not in catalog or day == days[-1]:
+                segment = self._segment(day)
+                if len(segment):
+                    first, last = segment.read(0, 1)[0], segment.read(len(segment) - 1, len(segment))[0]
+                    catalog[day] = {'count': len(segment), 'start': int(first['timestamp']),
+                                    'end': int(last['timestamp'])}
+                else:
+                    catalog.pop(day, None)
+        return dict(sorted(catalog.items()))
+
+    def _save_catalog(self):
+        path = os.path.join(self.directory, self.CATALOG_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.catalog, f)
+        os.replace(path + '.tmp', path)
+
+    def _segment(self, day):
+        """날짜 조각 열기 (오래 쓰지 않은 조각은 닫음)"""
+        if day in self.segments:
+            self.segments[day] = self.segments.pop(day)
+            return self.segments[day]
+        segment = self.segment_class(self._path(day), self.flush_every, self.flush_interval)
+        self.segments[day] = segment
+        while len(self.segments) > self.MAX_OPEN:
+            oldest = next(iter(self.segments))
+            self.segments.pop(oldest).close()
+        return segment
+
+    def _add(self, day, records):
+        entry = self.catalog.setdefault(day, {'count': 0, 'start': int(records['timestamp'][0]),
+                                              'end': 0})
+        entry['count'] += len(records)
+        entry['start'] = min(entry['start'], int(records['timestamp'][0]))
+        entry['end'] = max(entry['end'], int(records['timestamp'][-1]))
+        if list(self.catalog)[-1] != day:
+            self.catalog = dict(sorted(self.catalog.items()))
+
+    def __len__(self):
+        # 저장 스레드가 새 날짜를 추가하는 중에 순회하지 않도록 잠금
+        with self.lock:
+            return sum(entry['count'] for entry in self.catalog.values())
+
+    def days(self):
+        """기록이 있는 날짜 목록 ('YYYY-MM-DD', 오래된 순)"""
+        with self.lock:
+            return list(self.catalog)
+
+    def append(self, record):
+        with self.lock:
+            records = np.asarray(record, dtype=RECORD_DTYPE).reshape(1)
+            day = format_time(int(records['timestamp'][0]), '%Y-%m-%d')
+            self._segment(day).append(records[0])
+            self._add(day, records)
+
+    def extend(self, records):
+        """여러 기록을 날짜별 조각에 나눠 추가"""
+        records = np.asarray(records, dtype=RECORD_DTYPE)
+        records = records[np.argsort(records['timestamp'], kind='stable')]
+        with self.lock:
+            for day, first, last in split_by_day(records['timestamp']):
+                self._segment(day).extend(records[first:last])
+                self._add(day, records[first:last])
+
+    def flush(self):
+        with self.lock:
+            for segment in self.segments.values():
+                segment.flush()
+            self._save_catalog()
+
+    def sync(self):
+        """버퍼를 쓴 뒤 열린 조각을 디스크에 동기화
+
+        fsync/체크포인트는 느릴 수 있으므로 저장소 잠금을 놓은 뒤 경로로 처리한다
+        (그동안 GUI 스레드의 조회가 기다리지 않도록).
+        """
+        with self.lock:
+            for segment in self.segments.values():
+                segment.flush()
+            self._save_catalog()
+            paths = [self._path(day) for day in self.segments]
+        for path in paths:
+            self.segment_class.sync_path(path)
+
+    def read(self, start, stop):
+        """날짜 순서로 이어붙인 전체 기록 중 [start, stop) 구간"""
+        parts = []
+        with self.lock:
+            offset = 0
+            for day, entry in self.catalog.items():
+                first, last = max(start - offset, 0), min(stop - offset, entry['count'])
+                if first < last:
+                    parts.append(self._segment(day).read(first, last))
+                offset += entry['count']
+                if offset >= stop:
+                    break
+        if not parts:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    def iter_chunks(self, chunk_size=10000):
+        """처음부터 끝까지 chunk_size 개씩 스트리밍"""
+        for start in range(0, len(self), chunk_size):
+            yield self.read(start, start + chunk_size)
+
+    def _days_in(self, start, end):
+        """[start, end) 구간 (epoch 초) 과 겹치는 날짜"""
+        return [day for day, entry in self.catalog.items()
+                if (start is None or entry['end'] >= start * 1000) and
+                (end is None or entry['start'] < end * 1000)]
+
+    def day_range(self, day):
+        """하루치 기록의 전체 위치 범위 [start, stop)"""
+        with self.lock:
+            offset = 0
+            for catalog_day, entry in self.catalog.items():
+                if catalog_day == day:
+                    return offset, offset + entry['count']
+                offset += entry['count']
+        return offset, offset
+
+    def day_records(self, day):
+        """하루치 기록 전체"""
+        return self.read_day(day, 0, None)
+
+    def read_day(self, day, start, stop):
+        """하루치 기록 중 [start, stop) 구간 (날짜 안의 위치, stop 이 None 이면 끝까지)
+
+        다른 날짜가 추가/삭제되어도 위치가 바뀌지 않으므로 오래 걸리는 스트리밍에 쓴다.
+        """
+        with self.lock:
+            if day not in self.catalog:
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            segment = self._segment(day)
+            return segment.read(start, len(segment) if stop is None else stop)
+
+    def query(self, start=None, end=None, posture=None, status=None):
+        """시간 구간 (epoch 초) 과 자세/상태 조건에 맞는 기록"""
+        with self.lock:
+            parts = [self._segment(day).query(start, end, posture, status)
+                     for day in self._days_in(start, end)]
+        if not parts:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    def posture_counts(self, start=None, end=None):
+        """시간 구간의 자세별 샘플 수 (길이 256 배열)"""
+        counts = np.zeros(256, dtype=np.int64)
+        with self.lock:
+            for day in self._days_in(start, end):
+                counts += self._segment(day).posture_counts(start, end)
+        return counts
+
+    def drop_day(self, day):
+        """하루치 조각 삭제"""
+        with self.lock:
+            segment = self.segments.pop(day, None)
+            if segment is not None:
+                segment.close()
+            for path in (self._path(day), self._path(day) + '-wal', self._path(day) + '-shm'):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.catalog.pop(day, None)
+            self._save_catalog()
+
+    def clear(self):
+        with self.lock:
+            for day in list(self.catalog):
+                self.drop_day(day)
+
+    def close(self):
+        with self.lock:
+            for segment in self.segments.values():
+                segment.close()
+            self.segments = {}
+            self._save_catalog()
+
+
+ROLLUP_POSTURES = 16  # 집계할 자세 번호 수 (그 이상은 마지막 칸에 합산)
+
+ROLLUP_DTYPE = np.dtype([
+    ('start', '<i8'),                   # 구간 시작 (epoch 밀리초)
+    ('end', '<i8'),                     # 구간 끝
+    ('samples', '<u4'),
+    ('posture_seconds', '<f4', (ROLLUP_POSTURES,)),
+    ('bad_seconds', '<f4'),
+    ('alerts', '<u4'),                  # 양호 -> 불량 전환 수 (알림 대상)
+    ('mean', '<f4', (len(SENSOR_NAMES),)),
+    ('max', '<u2', (len(SENSOR_NAMES),)),
+])
+
+
+def merge_rollups(rows, start, end):
+    """여러 집계 행을 [start, end) 구간 하나로 합침 (평균은 샘플 수 가중)"""
+    merged = np.zeros((), dtype=ROLLUP_DTYPE)
+    merged['start'] = start
+    merged['end'] = end
+    if len(rows):
+        weights = rows['samples'].astype(np.float64)
+        merged['samples'] = weights.sum()
+        merged['posture_seconds'] = rows['posture_seconds'].sum(axis=0)
+        merged['bad_seconds'] = rows['bad_seconds'].sum()
+        merged['alerts'] = rows['alerts'].sum()
+        merged['mean'] = (rows['mean'] * weights[:, None]).sum(axis=0) / max(weights.sum(), 1)
+        merged['max'] = rows['max'].max(axis=0)
+    return merged
+
+
+class RollupStore:
+    """기록을 분/시간/일 단위 집계로 요약하고 단계별로 보관 기간을 두는 저장소
+
+    update() 는 저장소에서 아직 요약하지 않은 완료된 분의 기록만 읽어 분 단위
+    행을 만들고 (알림 수는 PostureAlertLog 의 상태 전환 시각으로 셈), 모든 분이 끝난 시간과 날짜를 다시 시간/일 단위 행으로 합친다.
+    각 단계는 directory/<단계>.bin 에 추가만 하는 파일이며, retention_days 를
+    넘은 행은 apply_retention() 에서 지운다 (일 단위는 계속 보관).
+    totals() 는 구간을 가장 큰 단위부터 채워 필요한 만큼만 작은 단위를 읽는다.
+    """
+
+    TIERS = ['minute', 'hour', 'day']
+    MINUTE_MS = 60 * 1000
+    HOUR_MS = 60 * MINUTE_MS
+    SETTLE_MS = 10 * 1000  # 저장 지연을 고려해 이만큼 지난 분부터 요약
+    CHUNK_MS = HOUR_MS     # 한 번에 읽는 구간 (저장소 잠금을 오래 잡지 않도록)
+
+    def __init__(self, directory, max_gap=10.0, retention_days=None):
+        self.directory = directory
+        self.max_gap = max_gap  # 샘플 하나가 대표하는 최대 시간 (초)
+        self.retention_days = retention_days or {'minute': 180, 'hour': 730}
+        # 요약 스레드와 GUI 스레드가 함께 쓰므로 잠금으로 보호
+        self.lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self.tiers = {tier: RecordBuffer(load_appended(self._path(tier), ROLLUP_DTYPE),
+                                         dtype=ROLLUP_DTYPE)
+                      for tier in self.TIERS}
+
+    def _path(self, tier):
+        return os.path.join(self.directory, f'{tier}.bin')
+
+    def _append(self, tier, rows):
+        rows = np.asarray(rows, dtype=ROLLUP_DTYPE).reshape(-1)
+        if len(rows) == 0:
+            return
+        with open(self._path(tier), 'ab') as f:
+            rows.tofile(f)
+        self.tiers[tier].extend(rows)
+
+    def rolled_until(self):
+        """요약이 끝난 시각 (epoch 밀리초)"""
+        with self.lock:
+            ends = [int(buffer.records['end'][-1]) for buffer in self.tiers.values() if len(buffer)]
+        return max(ends, default=0)
+
+    def covers(self, day):
+        """하루 전체가 요약되었는지 (원본 삭제 가능 여부)"""
+        return day_bounds(day)[1] * 1000 <= self.rolled_until()
+
+    def update(self, store, now, alerts=None):
+        """저장소의 새 기록을 요약. 새로 만든 분 단위 행 수를 반환
+
+        alerts 는 PostureAlertLog (없으면 알림 수는 0). 밀린 기록 (처음 실행 등) 은
+        CHUNK_MS 단위로 나눠 읽으므로, 그 사이 GUI/저장 스레드가 저장소를 쓸 수 있다.
+        """
+        cutoff = (int(now * 1000) - self.SETTLE_MS) // self.MINUTE_MS * self.MINUTE_MS
+        rolled = self.rolled_until()
+        added = 0
+        for day in store.days():
+            day_start, day_end = (int(bound * 1000) for bound in day_bounds(day))
+            if day_end <= rolled or day_start >= cutoff:
+                continue
+            day_stop = min(day_end, cutoff)
+            for start in range(max(day_start, rolled), day_stop, self.CHUNK_MS):
+                end = min(start + self.CHUNK_MS, day_stop)
+                records = store.query(start / 1000, end / 1000)
+                if len(records) == 0:
+                    continue
+                alert_times = (alerts.query(start / 1000, end / 1000) if alerts is not None
+                               else np.zeros(0, dtype=np.int64))
+                rows = self._minute_rows(records, end, alert_times)
+                with self.lock:
+                    self._append('minute', rows)
+                added += len(rows)
+        with self.lock:
+            self._roll_up('hour', 'minute')
+            self._roll_up('day', 'hour')
+        return added
+
+    def _minute_rows(self, records, end, alert_times):
+        """시간 순서 기록과 알림 시각 (epoch 밀리초) 을 분 단위 행으로 요약"""
+        timestamps = records['timestamp']
+        following = np.append(timestamps[1:], end)
+        durations = np.clip((following - timestamps) / 1000, 0, self.max_gap)
+        buckets = timestamps // self.MINUTE_MS * self.MINUTE_MS
+        starts, first, group = np.unique(buckets, return_index=True, return_inverse=True)
+
+        rows = np.zeros(len(starts), dtype=ROLLUP_DTYPE)
+        rows['start'] = starts
+        rows['end'] = starts + self.MINUTE_MS
+        rows['samples'] = np.bincount(group, minlength=len(starts))
+        postures = np.minimum(records['posture'], ROLLUP_POSTURES - 1)
+        np.add.at(rows['posture_seconds'], (group, postures), durations)
+        bad = ~np.isin(records['posture'], GOOD_POSTURES)
+        rows['bad_seconds'] = np.bincount(group, durations * bad, len(starts))
+        # 알림은 기록이 있는 분에만 속함 (나쁜 자세로 바뀐 시점에는 기록이 있음)
+        alert_buckets = alert_times // self.MINUTE_MS * self.MINUTE_MS
+        index = np.minimum(np.searchsorted(starts, alert_buckets), len(starts) - 1)
+        matched = starts[index] == alert_buckets
+        rows['alerts'] = np.bincount(index[matched], minlength=len(starts))
+        values = records['values']
+        rows['mean'] = np.add.reduceat(values, first, axis=0, dtype=np.float64) / \
+            rows['samples'][:, None]
+        rows['max'] = np.maximum.reduceat(values, first, axis=0)
+        return rows
+
+    def _roll_up(self, tier, source):
+        """끝난 시간/날짜의 작은 단위 행을 합쳐 tier 에 추가"""
+        done = self.tiers[tier].records['end'][-1] if len(self.tiers[tier]) else 0
+        limit = self.rolled_until()
+        rows = self.tiers[source].records
+        rows = rows[rows['start'] >= done]
+        if len(rows) == 0:
+            return
+        if tier == 'hour':
+            keys = rows['start'] // self.HOUR_MS * self.HOUR_MS
+            bounds = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1, [len(rows)]])
+            spans = [(int(keys[first]), int(keys[first]) + self.HOUR_MS, first, last)
+                     for first, last in zip(bounds[:-1], bounds[1:])]
+        else:
+            spans = [(*(int(bound * 1000) for bound in day_bounds(day)), first, last)
+                     for day, first, last in split_by_day(rows['start'])]
+        merged = []
+        for start, end, first, last in spans:
+            if end > limit:
+                break
+            merged.append(merge_rollups(rows[first:last], start, end))
+        self._append(tier, merged)
+
+    def apply_retention(self, now):
+        """보관 기간이 지난 분/시간 단위 행 삭제"""
+        with self.lock:
+            for tier, days in self.retention_days.items():
+                rows = self.tiers[tier].records
+                cutoff = int((now - days * 86400) * 1000)
+                if len(rows) == 0 or rows['start'][0] >= cutoff:
+                    continue
+                keep = rows[rows['start'] >= cutoff]
+                with open(self._path(tier) + '.tmp', 'wb') as f:
+                    keep.tofile(f)
+                os.replace(self._path(tier) + '.tmp', self._path(tier))
+                self.tiers[tier] = RecordBuffer(keep, dtype=ROLLUP_DTYPE)
+
+    def series(self, tier, start=None, end=None):
+        """tier 단위 행 중 [start, end) 구간 (epoch 초)"""
+        with self.lock:
+            rows = self.tiers[tier].records
+            first = 0 if start is None else np.searchsorted(rows['start'], int(start * 1000))
+            last = len(rows) if end is None else np.searchsorted(rows['start'], int(end * 1000))
+            return rows[first:last].copy()
+
+    def totals(self, start, end):
+        """[start, end) 구간 (epoch 초) 합계 (요약된 부분만, 큰 단위부터 사용)"""
+        gaps = [(int(start * 1000), int(end * 1000))]
+        parts = []
+        with self.lock:
+            for tier in reversed(self.TIERS):
+                rows = self.tiers[tier].records
+                remaining = []
+                for gap_start, gap_end in gaps:
+                    first = np.searchsorted(rows['start'], gap_start)
+                    last = np.searchsorted(rows['start'], gap_end)
+                    inside = rows[first:last]
+                    inside = inside[inside['end'] <= gap_end]
+                    if len(inside) == 0:
+                        remaining.append((gap_start, gap_end))
+                        continue
+                    parts.append(inside)
+                    remaining += [(gap_start, int(inside['start'][0])),
+                                  (int(inside['end'][-1]), gap_end)]
+                gaps = [(gap_start, gap_end) for gap_start, gap_end in remaining
+                        if gap_end > gap_start]
+        rows = np.concatenate(parts) if parts else np.zeros(0, dtype=ROLLUP_DTYPE)
+        return merge_rollups(rows, int(start * 1000), int(end * 1000))
+
+    def clear(self):
+        with self.lock:
+            for tier in self.TIERS:
+                self.tiers[tier] = RecordBuffer(dtype=ROLLUP_DTYPE)
+                if os.path.exists(self._path(tier)):
+                    os.remove(self._path(tier))
+
+
+FRAME_DTYPE = np.dtype([
+    ('timestamp', '<i8'),               # epoch 밀리초
+    ('values', '<u2', (len(SENSOR_NAMES),)),
+])
+
+
+def make_frame(timestamp, values):
+    """원본 프레임 하나 생성 (timestamp 는 epoch 초)"""
+    frame = np.zeros((), dtype=FRAME_DTYPE)
+    frame['timestamp'] = int(round(timestamp * 1000))
+    frame['values'] = np.clip(np.rint(values), 0, 65535)
+    return frame
+
+
+class FrameArchive:
+    """수신한 원본 센서 프레임을 날짜별 열 파일로 보관하는 저장소
+
+    날짜마다 디렉터리 하나에 timestamps.i8 (epoch 밀리초) 와 values.u2
+    ((n, 16) 블록) 를 둔다. 프레임은 버퍼에 모았다가 묶음으로 파일 끝에
+    추가하고, 읽을 때는 numpy.memmap 으로 매핑하므로 한 달치 데이터도
+    파싱이나 전체 로드 없이 벡터 연산으로 처리할 수 있다.
+    """
+
+    TIMESTAMP_FILE = 'timestamps.i8'
+    VALUES_FILE = 'values.u2'
+
+    def __init__(self, directory, flush_every=256, flush_interval=5.0, writer=None):
+        self.directory = directory
+        self.writer = writer
+        self.last_day = None
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending = RecordBuffer(capacity=flush_every, dtype=FRAME_DTYPE)
+        self.last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+
+    def days(self):
+        """보관 중인 날짜 목록 ('YYYY-MM-DD', 오래된 순)"""
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.isdir(os.path.join(self.directory, name)))
+
+    def _paths(self, day):
+        folder = os.path.join(self.directory, day)
+        return os.path.join(folder, self.TIMESTAMP_FILE), os.path.join(folder, self.VALUES_FILE)
+
+    def _count(self, day, repair=False):
+        """온전한 프레임 수 (두 열 중 짧은 쪽 기준)
+
+        repair 가 참이면 끊긴 꼬리를 잘라낸다. 저장 스레드가 두 열 파일을 차례로
+        쓰는 중일 수 있으므로, 잘라내기는 쓰는 쪽 (extend) 에서만 한다.
+        """
+        paths = self._paths(day)
+        itemsizes = (FRAME_DTYPE['timestamp'].itemsize, FRAME_DTYPE['values'].itemsize)
+        try:
+            sizes = [os.path.getsize(path) for path in paths]
+        except OSError:
+            return 0
+        count = min(size // itemsize for size, itemsize in zip(sizes, itemsizes))
+        if not repair:
+            return count
+        for path, size, itemsize in zip(paths, sizes, itemsizes):
+            if size != count * itemsize:
+                with open(path, 'r+b') as f:
+                    f.truncate(count * itemsize)
+        return count
+
+    def append(self, timestamp, values):
+        """프레임 하나 추가 (timestamp 는 epoch 초)"""
+        frame = make_frame(timestamp, values)
+        if self.writer is not None:
+            self.writer.submit(self, frame)
+            return
+        self.pending.append(frame)
+        if len(self.pending) >= self.flush_every or \
+                time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def extend(self, frames):
+        """여러 프레임을 날짜별 파일 끝에 추가"""
+        frames = np.asarray(frames, dtype=FRAME_DTYPE)
+        if len(frames) == 0:
+            return
+        frames = frames[np.argsort(frames['timestamp'], kind='stable')]
+        for day, first, last in split_by_day(frames['timestamp']):
+            chunk = frames[first:last]
+            os.makedirs(os.path.join(self.directory, day), exist_ok=True)
+            timestamp_path, values_path = self._paths(day)
+            self._count(day, repair=True)
+            with open(timestamp_path, 'ab') as f:
+                np.ascontiguousarray(chunk['timestamp']).tofile(f)
+            with open(values_path, 'ab') as f:
+                np.ascontiguousarray(chunk['values']).tofile(f)
+            self.last_day = day
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.drain()
+        self.extend(self.pending.records)
+        self.pending.clear()
+        self.last_flush = time.monotonic()
+
+    def sync(self):
+        """마지막으로 기록한 날짜의 파일을 디스크에 동기화"""
+        if self.last_day is None:
+            return
+        for path in self._paths(self.last_day):
+            with open(path, 'ab') as f:
+                os.fsync(f.fileno())
+
+    def day(self, day):
+        """하루치 (timestamps (n,), values (n, 16)) 메모리 매핑 (읽기 전용, 파일은 고치지 않음)"""
+        self.flush()
+        count = self._count(day)
+        if count == 0:
+            return np.zeros(0, dtype='<i8'), np.zeros((0, len(SENSOR_NAMES)), dtype='<u2')
+        timestamp_path, values_path = self._paths(day)
+        return (np.memmap(timestamp_path, dtype='<i8', mode='r', shape=(count,)),
+                np.memmap(values_path, dtype='<u2', mode='r', shape=(count, len(SENSOR_NAMES))))
+
+    def iter_range(self, start=None, end=None):
+        """[start, end) 구간 (epoch 초) 을 날짜별 매핑 조각으로 반환 (복사 없음)"""
+        first_day = None if start is None else format_time(start * 1000, '%Y-%m-%d')
+        last_day = None if end is None else format_time(end * 1000, '%Y-%m-%d')
+        for day in self.days():
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            timestamps, values = self.day(day)
+            first = 0 if start is None else np.searchsorted(timestamps, int(start * 1000))
+            last = len(timestamps) if end is None else np.searchsorted(timestamps, int(end * 1000))
+            if last > first:
+                yield timestamps[first:last], values[first:last]
+
+    def channel_summary(self, start=None, end=None):
+        """구간의 채널별 프레임 수, 평균, 최대값"""
+        count = 0
+        total = np.zeros(len(SENSOR_NAMES))
+        peak = np.zeros(len(SENSOR_NAMES), dtype=np.uint16)
+        for _, values in self.iter_range(start, end):
+            count += len(values)
+            total += values.sum(axis=0, dtype=np.float64)
+            peak = np.maximum(peak, values.max(axis=0))
+        return {'count': count, 'mean': total / max(count, 1), 'max': peak}
+
+    def drop_day(self, day):
+        """하루치 보관 데이터 삭제"""
+        shutil.rmtree(os.path.join(self.directory, day), ignore_errors=True)
+
+    def clear(self):
+        if self.writer is not None:
+            self.writer.drain()
+        self.pending.clear()
+        self.last_day = None
+        for day in self.days():
+            self.drop_day(day)
+
+
+class WriteBehindWriter:
+    """기록 저장을 GUI 스레드 밖에서 처리하는 저장 스레드
+
+    submit() 은 (저장소, 기록) 을 제한된 큐에 넣기만 한다. 스레드는 저장소별로
+    기록을 모아 batch_size 개가 되거나 batch_interval 초가 지나면 저장소의
+    extend() 로 한 번에 쓴다. 큐가 가득 차면 submit() 이 잠시 기다린다
+    (디스크가 계속 느릴 때 메모리가 무한히 늘지 않도록).
+
+    fsync 정책:
+      none     - 운영체제에 맡김
+      periodic - fsync_interval 초마다 sync()
+      batch    - 묶음을 쓸 때마다 sync()
+    """
+
+    FSYNC_POLICIES = ['none', 'periodic', 'batch']
+
+    def __init__(self, batch_size=100, batch_interval=0.5, fsync='periodic',
+                 fsync_interval=5.0, max_queue=10000):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f'알 수 없는 fsync 정책: {fsync}')
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.queue = queue.Queue(max_queue)
+        self.last_error = None
+        self.written = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, sink, item):
+        self.queue.put((sink, item))
+
+    def drain(self, timeout=None):
+        """지금까지 넣은 기록을 모두 쓸 때까지 대기"""
+        if not self.thread.is_alive():
+            return True
+        done = threading.Event()
+        self.queue.put((None, done))
+        return done.wait(timeout)
+
+    def stop(self, timeout=None):
+        """남은 기록을 모두 쓰고 스레드 종료"""
+        if not self.thread.is_alive():
+            return
+        self.queue.put((None, None))
+        self.thread.join(timeout)
+
+    def take_error(self):
+        """마지막 저장 오류 (한 번 읽으면 지워짐)"""
+        error, self.last_error = self.last_error, None
+        return error
+
+    def _run(self):
+        batches = {}
+        pending = 0
+        unsynced = set()
+        deadline = time.monotonic() + self.batch_interval
+        last_sync = time.monotonic()
+        while True:
+            try:
+                sink, item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                sink, item = None, False
+            if sink is not None:
+                batches.setdefault(sink, []).append(item)
+                pending += 1
+                if pending < self.batch_size and time.monotonic() < deadline:
+                    continue
+
+            self._write(batches)
+            unsynced.update(batches)
+            if self.fsync == 'batch' or (self.fsync == 'periodic' and
+                                         time.monotonic() - last_sync >= self.fsync_interval):
+                self._sync(unsynced)
+                unsynced.clear()
+                last_sync = time.monotonic()
+            batches = {}
+            pending = 0
+            deadline = time.monotonic() + self.batch_interval
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None and sink is None:
+                # 종료 요청: 정책과 관계없이 마지막으로 동기화
+                if self.fsync != 'none':
+                    self._sync(unsynced)
+                return
+
+    def _write(self, batches):
+        for sink, items in batches.items():
+            try:
+                sink.extend(items)
+                self.written += len(items)
+            except Exception as e:
+                self.last_error = f'기록 저장 실패: {e}'
+
+    def _sync(self, sinks):
+        for sink in sinks:
+            try:
+                sink.sync()
+            except Exception as e:
+                self.last_error = f'디스크 동기화 실패: {e}'
+
+
+class JsonSnapshotFile:
+    """통째로 바꿔 쓰는 JSON 파일 (설정 등, WriteBehindWriter 저장소로 사용)
+
+    묶음 중 마지막 값만 임시 파일에 쓰고 동기화한 뒤 교체하므로, 쓰는 도중
+    종료되어도 기존 파일이 남는다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def extend(self, snapshots):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(snapshots[-1], f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def sync(self):
+        pass  # extend() 에서 이미 동기화함
+
+
+EVENT_DTYPE = np.dtype([
+    ('start', '<i8'),           # 구간 시작 (epoch 밀리초)
+    ('end', '<i8'),             # 구간 종료 (epoch 밀리초)
+    ('from_posture', 'u1'),     # 직전 자세
+    ('posture', 'u1'),          # 이 구간의 자세
+    # 구간이 시작될 때의 특징
+    ('cop_x', '<f2'),
+    ('cop_y', '<f2'),
+    ('lr_balance', '<f2'),
+    ('fb_balance', '<f2'),
+])
+
+
+def make_event(start, end, from_posture, posture, features=None):
+    """자세 구간 이벤트 생성 (시간은 epoch 초)"""
+    event = np.zeros((), dtype=EVENT_DTYPE)
+    event['start'] = int(round(start * 1000))
+    event['end'] = int(round(end * 1000))
+    event['from_posture'] = from_posture
+    event['posture'] = posture
+    if features is not None:
+        for name in ('cop_x', 'cop_y', 'lr_balance', 'fb_balance'):
+            event[name] = features[name]
+    return event
+
+
+class PostureEventStore:
+    """자세 전환 구간을 추가만 하는 파일에 저장하고 시간/자세별 색인으로 조회
+
+    이벤트는 시작 시각 순서로 추가되므로 시간 색인은 시작 시각 열에 대한
+    이진 탐색이고, 자세 색인은 자세별 행 번호 목록이다. 저장 스레드가 추가하고
+    GUI 스레드가 조회하므로 잠금으로 보호한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.events = RecordBuffer(dtype=EVENT_DTYPE)
+        self.by_posture = {}
+        events = load_appended(path, EVENT_DTYPE)
+        if events is not None:
+            self.events.extend(events)
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        postures = self.events.records['posture']
+        order = np.argsort(postures, kind='stable')
+        bounds = np.flatnonzero(np.diff(postures[order])) + 1
+        self.by_posture = {int(postures[rows[0]]): RecordBuffer(rows, dtype=np.int64)
+                           for rows in np.split(order, bounds) if len(rows)}
+
+    def __len__(self):
+        return len(self.events)
+
+    def append(self, event):
+        self.extend([event])
+
+    def extend(self, events):
+        """여러 구간을 파일 끝에 한 번에 추가 (WriteBehindWriter 저장소로 사용)"""
+        events = np.asarray(events, dtype=EVENT_DTYPE).reshape(-1)
+        with self.lock:
+            row = len(self.events)
+            with open(self.path, 'ab') as f:
+                events.tofile(f)
+            self.events.extend(events)
+            for posture in events['posture'].tolist():
+                if posture not in self.by_posture:
+                    self.by_posture[posture] = RecordBuffer(dtype=np.int64)
+                self.by_posture[posture].append(row)
+                row += 1
+
+    def sync(self):
+        RecordLog.sync_path(self.path)
+
+    def query(self, posture=None, start=None, end=None, min_duration=None):
+        """조건에 맞는 구간 (시간은 epoch 초, min_duration 은 초)"""
+        with self.lock:
+            events = self.events.records
+            if posture is None:
+                rows = None
+                starts = events['start']
+            else:
+                if posture not in self.by_posture:
+                    return np.zeros(0, dtype=EVENT_DTYPE)
+                rows = self.by_posture[posture].records
+                starts = events['start'][rows]
+
+            first = 0 if start is None else np.searchsorted(starts, int(start * 1000), 'left')
+            last = len(starts) if end is None else np.searchsorted(starts, int(end * 1000), 'left')
+            result = events[first:last].copy() if rows is None else events[rows[first:last]]
+
+        if min_duration is not None:
+            result = result[(result['end'] - result['start']) >= min_duration * 1000]
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.events.clear()
+            self.by_posture = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class PostureAlertLog:
+    """자세 상태 머신이 '불량' 으로 바뀐 시각(알림)을 추가만 하는 파일에 저장
+
+    GUI 스레드가 추가하고 요약 스레드가 조회하므로 잠금으로 보호한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.times = RecordBuffer(load_appended(path, '<i8'), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, timestamp):
+        """알림 시각 (epoch 초) 추가"""
+        moment = np.array([int(round(timestamp * 1000))], dtype='<i8')
+        with self.lock:
+            self.times.extend(moment)
+            with open(self.path, 'ab') as f:
+                moment.tofile(f)
+
+    def query(self, start=None, end=None):
+        """[start, end) (epoch 초) 안의 알림 시각 (epoch 밀리초)"""
+        with self.lock:
+            times = self.times.records
+            first = 0 if start is None else np.searchsorted(times, int(start * 1000), 'left')
+            last = len(times) if end is None else np.searchsorted(times, int(end * 1000), 'left')
+            return times[first:last].copy()
+
+    def clear(self):
+        with self.lock:
+            self.times.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+SESSION_DTYPE = np.dtype([
+    ('start', '<i8'),   # epoch 밀리초
+    ('end', '<i8'),
+    ('seated', '<f4'),  # 착석 자세로 보낸 초
+    ('bad', '<f4'),     # 그중 나쁜 자세 초
+])
+
+
+def make_session(start, end, seated=0.0, bad=0.0):
+    """착석 세션 생성 (시간은 epoch 초)"""
+    session = np.zeros((), dtype=SESSION_DTYPE)
+    session['start'] = int(round(start * 1000))
+    session['end'] = int(round(end * 1000))
+    session['seated'] = seated
+    session['bad'] = bad
+    return session
+
+
+class PostureSessionStore:
+    """앉았다 일어난 세션을 추가만 하는 파일에 저장하고 시작 시각으로 조회
+
+    저장 스레드가 추가하고 GUI 스레드가 조회하므로 잠금으로 보호한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.sessions = RecordBuffer(load_appended(path, SESSION_DTYPE), dtype=SESSION_DTYPE)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def append(self, session):
+        self.extend([session])
+
+    def extend(self, sessions):
+        """여러 세션을 파일 끝에 한 번에 추가 (WriteBehindWriter 저장소로 사용)"""
+        sessions = np.asarray(sessions, dtype=SESSION_DTYPE).reshape(-1)
+        with self.lock:
+            with open(self.path, 'ab') as f:
+                sessions.tofile(f)
+            self.sessions.extend(sessions)
+
+    def sync(self):
+        RecordLog.sync_path(self.path)
+
+    def query(self, start=None, end=None):
+        """시작 시각이 [start, end) (epoch 초) 인 세션"""
+        with self.lock:
+            sessions = self.sessions.records
+            first = 0 if start is None else np.searchsorted(sessions['start'], int(start * 1000), 'left')
+            last = len(sessions) if end is None else np.searchsorted(sessions['start'], int(end * 1000), 'left')
+            return sessions[first:last].copy()
+
+    def clear(self):
+        with self.lock:
+            self.sessions.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
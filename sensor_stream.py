@@ -0,0 +1,702 @@
+# 센서 스트림 처리 모듈
+# 16채널 압력 데이터를 (n, 16) 배열 단위로 처리한다.
+
+import os
+from collections import deque
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+SENSOR_COUNT = 16
+
+# 기본 해상도 (버킷 폭 초, 보관 버킷 수)
+DEFAULT_PYRAMID_LEVELS = [
+    (1, 3600),      # 1초 버킷 - 1시간
+    (10, 2880),     # 10초 버킷 - 8시간
+    (60, 1440),     # 1분 버킷 - 24시간
+    (600, 1008),    # 10분 버킷 - 7일
+]
+
+
+def as_batch(values, channels=SENSOR_COUNT):
+    """입력 값을 (n, channels) float 배열로 변환"""
+    batch = np.asarray(values, dtype=np.float64)
+    if batch.ndim == 1:
+        batch = batch.reshape(1, -1)
+    if batch.shape[1] != channels:
+        raise ValueError(f'채널 수가 맞지 않습니다: {batch.shape[1]} != {channels}')
+    return batch
+
+
+class PyramidLevel:
+    """한 해상도의 min/max/mean 버킷 링 버퍼"""
+
+    def __init__(self, width, capacity, channels=SENSOR_COUNT):
+        self.width = width
+        self.capacity = capacity
+        self.bucket_ids = np.full(capacity, -1, dtype=np.int64)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.mins = np.zeros((capacity, channels))
+        self.maxs = np.zeros((capacity, channels))
+        self.sums = np.zeros((capacity, channels))
+
+    def add(self, timestamps, values):
+        ids = np.floor(timestamps / self.width).astype(np.int64)
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        slots = unique_ids % self.capacity
+
+        # 링 버퍼에서 밀려난 슬롯은 새 버킷으로 초기화
+        stale = self.bucket_ids[slots] != unique_ids
+        if stale.any():
+            fresh = slots[stale]
+            self.bucket_ids[fresh] = unique_ids[stale]
+            self.counts[fresh] = 0
+            self.mins[fresh] = np.inf
+            self.maxs[fresh] = -np.inf
+            self.sums[fresh] = 0.0
+
+        rows = slots[inverse]
+        np.add.at(self.counts, rows, 1)
+        np.minimum.at(self.mins, rows, values)
+        np.maximum.at(self.maxs, rows, values)
+        np.add.at(self.sums, rows, values)
+
+    def query(self, start, end):
+        """[start, end) 구간의 버킷 반환 (비어있는 버킷은 제외)"""
+        first = int(np.floor(start / self.width))
+        last = int(np.floor(end / self.width))
+        ids = np.arange(max(first, last - self.capacity + 1), last + 1, dtype=np.int64)
+        slots = ids % self.capacity
+        valid = self.bucket_ids[slots] == ids
+        ids, slots = ids[valid], slots[valid]
+
+        counts = self.counts[slots][:, None]
+        return {
+            'time': ids * self.width,
+            'min': self.mins[slots],
+            'max': self.maxs[slots],
+            'mean': self.sums[slots] / counts,
+        }
+
+    def oldest_time(self):
+        valid = self.bucket_ids[self.bucket_ids >= 0]
+        if valid.size == 0:
+            return None
+        return int(valid.min()) * self.width
+
+
+class PressurePyramid:
+    """채널별 min/max/mean 다중 해상도 요약 (그래프 장시간 표시용)"""
+
+    def __init__(self, levels=None, channels=SENSOR_COUNT):
+        self.channels = channels
+        self.levels = [PyramidLevel(width, capacity, channels)
+                       for width, capacity in (levels or DEFAULT_PYRAMID_LEVELS)]
+        self.first_time = None
+
+    def process(self, timestamps, values):
+        """새 샘플 배치를 모든 해상도에 반영"""
+        values = as_batch(values, self.channels)
+        timestamps = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+        if timestamps.size == 0:
+            return values
+        if self.first_time is None:
+            self.first_time = float(timestamps.min())
+        for level in self.levels:
+            level.add(timestamps, values)
+        return values
+
+    def choose_level(self, start, end, max_points):
+        """구간을 max_points 이하로 표현할 수 있는 가장 세밀한 해상도 선택"""
+        if self.first_time is None:
+            return self.levels[0]
+
+        # 데이터가 없는 앞부분은 제외하고 필요한 구간 계산
+        start = max(start, self.first_time)
+        span = max(end - start, 0)
+        for level in self.levels:
+            oldest = level.oldest_time()
+            covers = oldest is not None and oldest <= start
+            if covers and span / level.width <= max_points:
+                return level
+        return self.levels[-1]
+
+    def query(self, start, end, max_points):
+        """픽셀 폭(max_points)에 맞는 해상도로 구간 요약 조회"""
+        level = self.choose_level(start, end, max_points)
+        result = level.query(start, end)
+        result['width'] = level.width
+        return result
+
+    def clear(self):
+        self.levels = [PyramidLevel(level.width, level.capacity, self.channels)
+                       for level in self.levels]
+        self.first_time = None
+
+
+class RollingStats:
+    """채널별 이동 통계 (윈도우 평균/분산, 최소/최대, EWMA)"""
+
+    def __init__(self, window=100, alpha=0.1, channels=SENSOR_COUNT):
+        self.window = window
+        self.alpha = alpha
+        self.channels = channels
+        self.reset()
+
+    def reset(self):
+        self.count = 0          # 윈도우 안의 샘플 수
+        self.total_count = 0    # 지금까지 들어온 샘플 수
+        self.buffer = np.zeros((self.window, self.channels))
+        self.mean = np.zeros(self.channels)
+        self.m2 = np.zeros(self.channels)
+        self.ewma = np.zeros(self.channels)
+        # 채널별 단조 덱: (순번, 값)
+        self.min_deques = [deque() for _ in range(self.channels)]
+        self.max_deques = [deque() for _ in range(self.channels)]
+
+    def process(self, timestamps, values):
+        """새 샘플 배치를 통계에 반영 (입력은 그대로 다음 단계로 전달)"""
+        values = as_batch(values, self.channels)
+        for row in values:
+            self._add(row)
+        return values
+
+    def _add(self, row):
+        seq = self.total_count
+        slot = seq % self.window
+
+        # Welford 방식 윈도우 평균/분산 갱신
+        if self.count < self.window:
+            self.count += 1
+            delta = row - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (row - self.mean)
+        else:
+            old = self.buffer[slot]
+            old_mean = self.mean.copy()
+            self.mean += (row - old) / self.window
+            self.m2 += (row - old) * (row - self.mean + old - old_mean)
+            np.maximum(self.m2, 0.0, out=self.m2)
+        self.buffer[slot] = row
+
+        if self.total_count == 0:
+            self.ewma[:] = row
+        else:
+            self.ewma += self.alpha * (row - self.ewma)
+        self.total_count += 1
+
+        # 단조 덱으로 윈도우 최소/최대 유지
+        expire = seq - self.window
+        for channel, value in enumerate(row.tolist()):
+            min_deque = self.min_deques[channel]
+            while min_deque and min_deque[-1][1] >= value:
+                min_deque.pop()
+            min_deque.append((seq, value))
+            if min_deque[0][0] <= expire:
+                min_deque.popleft()
+
+            max_deque = self.max_deques[channel]
+            while max_deque and max_deque[-1][1] <= value:
+                max_deque.pop()
+            max_deque.append((seq, value))
+            if max_deque[0][0] <= expire:
+                max_deque.popleft()
+
+    def variance(self):
+        if self.count < 2:
+            return np.zeros(self.channels)
+        return self.m2 / (self.count - 1)
+
+    def std(self):
+        return np.sqrt(self.variance())
+
+    def minimum(self):
+        return np.array([d[0][1] if d else 0.0 for d in self.min_deques])
+
+    def maximum(self):
+        return np.array([d[0][1] if d else 0.0 for d in self.max_deques])
+
+    def snapshot(self):
+        """현재 통계를 딕셔너리로 반환"""
+        return {
+            'count': self.count,
+            'mean': self.mean.copy(),
+            'std': self.std(),
+            'min': self.minimum(),
+            'max': self.maximum(),
+            'ewma': self.ewma.copy(),
+        }
+
+
+class EmaFilter:
+    """지수 이동 평균 필터 (채널별 상태 유지)"""
+
+    def __init__(self, alpha=0.3, channels=SENSOR_COUNT):
+        self.alpha = alpha
+        self.channels = channels
+        self.reset()
+
+    def reset(self):
+        self.state = None
+
+    def process(self, timestamps, values):
+        values = as_batch(values, self.channels)
+        output = np.empty_like(values)
+        state = values[0].copy() if self.state is None else self.state
+        for i, row in enumerate(values):
+            state = state + self.alpha * (row - state)
+            output[i] = state
+        self.state = state
+        return output
+
+
+class MedianFilter:
+    """이동 중앙값 필터 (직전 size-1개 샘플을 다음 배치로 이어받음)"""
+
+    def __init__(self, size=5, channels=SENSOR_COUNT):
+        self.size = size
+        self.channels = channels
+        self.reset()
+
+    def reset(self):
+        # 시작 구간은 NaN 으로 채워 있는 샘플만으로 중앙값 계산
+        self.history = np.full((self.size - 1, self.channels), np.nan)
+
+    def process(self, timestamps, values):
+        values = as_batch(values, self.channels)
+        if len(values) == 0:
+            return values
+        combined = np.concatenate([self.history, values])
+        windows = np.lib.stride_tricks.sliding_window_view(combined, self.size, axis=0)
+        output = np.nanmedian(windows, axis=-1)
+        self.history = combined[len(combined) - (self.size - 1):]
+        return output
+
+
+class LowPassFilter:
+    """2차 버터워스 IIR 저역 통과 필터 (Direct Form II Transposed)"""
+
+    def __init__(self, cutoff=1.0, sample_rate=10.0, q=0.7071, channels=SENSOR_COUNT):
+        self.cutoff = cutoff
+        self.sample_rate = sample_rate
+        self.q = q
+        self.channels = channels
+        self._design()
+        self.reset()
+
+    def _design(self):
+        # 쌍선형 변환 계수 (RBJ Audio EQ Cookbook)
+        w0 = 2 * np.pi * self.cutoff / self.sample_rate
+        alpha = np.sin(w0) / (2 * self.q)
+        cos_w0 = np.cos(w0)
+        a0 = 1 + alpha
+        self.b0 = (1 - cos_w0) / 2 / a0
+        self.b1 = (1 - cos_w0) / a0
+        self.b2 = self.b0
+        self.a1 = -2 * cos_w0 / a0
+        self.a2 = (1 - alpha) / a0
+
+    def reset(self):
+        self.z1 = None
+        self.z2 = None
+
+    def process(self, timestamps, values):
+        values = as_batch(values, self.channels)
+        if len(values) == 0:
+            return values
+        if self.z1 is None:
+            # 첫 샘플 값에서 정상 상태로 시작해 초기 과도 응답 제거
+            first = values[0]
+            self.z2 = first * (self.b2 - self.a2)
+            self.z1 = first * (self.b1 - self.a1) + self.z2
+
+        output = np.empty_like(values)
+        z1, z2 = self.z1, self.z2
+        for i, x in enumerate(values):
+            y = self.b0 * x + z1
+            z1 = self.b1 * x - self.a1 * y + z2
+            z2 = self.b2 * x - self.a2 * y
+            output[i] = y
+        self.z1, self.z2 = z1, z2
+        return output
+
+
+SENSOR_FILTERS = {
+    'ema': EmaFilter,
+    'median': MedianFilter,
+    'lowpass': LowPassFilter,
+}
+
+
+def create_filter(name, **options):
+    """이름으로 필터 단계 생성 ('none' 이나 알 수 없는 이름이면 None)"""
+    filter_class = SENSOR_FILTERS.get(name)
+    if filter_class is None:
+        return None
+    return filter_class(**options)
+
+
+class SensorPipeline:
+    """(timestamps, values) 배치를 순서대로 각 단계에 전달하는 처리 파이프라인
+
+    각 단계는 process(timestamps, values) 를 구현하고 다음 단계로 넘길
+    (n, 16) 배열을 반환한다.
+    """
+
+    def __init__(self, stages=None):
+        self.stages = list(stages or [])
+
+    def add_stage(self, stage):
+        self.stages.append(stage)
+        return stage
+
+    def process(self, timestamps, values):
+        timestamps = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+        values = as_batch(values)
+        for stage in self.stages:
+            values = stage.process(timestamps, values)
+        return values
+
+
+class SensorHealthMonitor:
+    """채널별 고장 감시 (단선, 고정값, 포화, 부하와 무관한 잡음)
+
+    채널마다 지수 가중 평균/분산, 마지막 값 변화 시각, 포화 비율, 나머지
+    채널 합과의 상관계수를 유지하며 배치마다 O(채널 수) 로 갱신한다.
+    상태가 바뀐 채널에 대해서만 이벤트를 만든다.
+    """
+
+    ISSUES = ['dead', 'stuck', 'saturated', 'noisy']
+    ISSUE_NAMES = {
+        'dead': '단선 의심 (0 고정)',
+        'stuck': '값 고정',
+        'saturated': '포화 (단락 의심)',
+        'noisy': '부하와 무관한 잡음',
+    }
+
+    def __init__(self, names=None, alpha=0.02, flat_seconds=60.0, change_epsilon=1.0,
+                 dead_level=2.0, saturation_level=1020.0, saturation_ratio=0.9,
+                 activity_std=20.0, noise_std=15.0, min_correlation=0.1,
+                 warmup=100, channels=SENSOR_COUNT):
+        self.names = names or [f'A{i + 1}' for i in range(channels)]
+        self.alpha = alpha
+        self.flat_seconds = flat_seconds
+        self.change_epsilon = change_epsilon
+        self.dead_level = dead_level
+        self.saturation_level = saturation_level
+        self.saturation_ratio = saturation_ratio
+        self.activity_std = activity_std
+        self.noise_std = noise_std
+        self.min_correlation = min_correlation
+        self.warmup = warmup
+        self.channels = channels
+        self.events = []    # 아직 가져가지 않은 상태 변화 이벤트
+        self.reset()
+
+    def reset(self):
+        channels = self.channels
+        self.count = 0
+        self.last_values = None
+        self.last_change = np.zeros(channels)
+        self.mean = np.zeros(channels)
+        self.var = np.zeros(channels)
+        self.saturation = np.zeros(channels)
+        # 나머지 채널 합 (총합 - 자기 채널) 의 통계와 공분산
+        self.other_mean = np.zeros(channels)
+        self.other_var = np.zeros(channels)
+        self.covariance = np.zeros(channels)
+        self.flags = np.zeros((len(self.ISSUES), channels), dtype=bool)
+
+    def process(self, timestamps, values):
+        values = as_batch(values, self.channels)
+        a = self.alpha
+        for timestamp, row in zip(timestamps, values):
+            if self.last_values is None:
+                self.last_values = row.copy()
+                self.last_change[:] = timestamp
+                self.mean[:] = row
+                self.other_mean[:] = row.sum() - row
+
+            changed = np.abs(row - self.last_values) > self.change_epsilon
+            self.last_change[changed] = timestamp
+            self.last_values = row
+
+            others = row.sum() - row
+            delta = row - self.mean
+            other_delta = others - self.other_mean
+            self.mean += a * delta
+            self.other_mean += a * other_delta
+            self.var = (1 - a) * (self.var + a * delta * delta)
+            self.other_var = (1 - a) * (self.other_var + a * other_delta * other_delta)
+            self.covariance = (1 - a) * (self.covariance + a * delta * other_delta)
+            self.saturation += a * ((row >= self.saturation_level) - self.saturation)
+            self.count += 1
+
+        if len(values) and self.count >= self.warmup:
+            self._update_flags(float(timestamps[-1]))
+        return values
+
+    def correlation(self):
+        denominator = np.sqrt(self.var * self.other_var)
+        return np.divide(self.covariance, denominator,
+                         out=np.zeros(self.channels), where=denominator > 0)
+
+    def _update_flags(self, now):
+        std = np.sqrt(self.var)
+        active = np.sqrt(self.other_var) >= self.activity_std   # 다른 채널에 부하 변화가 있음
+        flat = (now - self.last_change) >= self.flat_seconds
+        value = self.last_values
+        # 잡음 판정은 해제 기준을 더 높게 두어 경계에서 깜빡이지 않도록 함
+        correlation = np.abs(self.correlation())
+        uncorrelated = np.where(self.flags[3], correlation < 2 * self.min_correlation,
+                                correlation < self.min_correlation)
+
+        flags = np.array([
+            flat & active & (value <= self.dead_level),
+            flat & active & (value > self.dead_level) & (value < self.saturation_level),
+            self.saturation >= self.saturation_ratio,
+            active & (std >= self.noise_std) & uncorrelated,
+        ])
+        for issue_index, channel in zip(*np.nonzero(flags != self.flags)):
+            self.events.append({
+                'timestamp': now,
+                'sensor': self.names[channel],
+                'issue': self.ISSUES[issue_index],
+                'active': bool(flags[issue_index, channel]),
+            })
+        self.flags = flags
+
+    def take_events(self):
+        """쌓인 이벤트를 꺼내고 비움"""
+        events, self.events = self.events, []
+        return events
+
+    def problems(self):
+        """현재 문제가 있는 (센서 이름, 문제) 목록"""
+        return [(self.names[channel], self.ISSUES[issue])
+                for issue, channel in zip(*np.nonzero(self.flags))]
+
+
+class QuantileSketch:
+    """여러 열을 함께 처리하는 KLL 방식 분위수 스케치
+
+    모든 열이 샘플마다 값을 하나씩 받으므로 레벨별 버퍼를 (m, 열 수) 배열로
+    두고 압축(열마다 정렬 후 한 칸씩 건너 뛰어 상위 레벨로 올림)을 열 전체에
+    한 번에 적용한다. 크기는 k 에 비례하는 상수이며 merge() 로 합칠 수 있다.
+    """
+
+    def __init__(self, columns, k=128, seed=None):
+        self.columns = columns
+        self.k = k
+        self.count = 0
+        self.levels = [np.zeros((0, columns), dtype=np.float32)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels)
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (depth - 1 - level))))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float32).reshape(-1, self.columns)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.zeros((0, self.columns), dtype=np.float32))
+                # 홀수 개면 한 행은 현재 레벨에 남김
+                keep = items[:len(items) % 2]
+                pairs = np.sort(items[len(keep):], axis=0)
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros((0, self.columns), dtype=np.float32))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """분위수 (len(qs), 열 수) 배열. 데이터가 없으면 NaN"""
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.count == 0:
+            return np.full((len(qs), self.columns), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.float64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(items, axis=0)
+        sorted_items = np.take_along_axis(items, order, axis=0)
+        cumulative = np.cumsum(weights[order], axis=0)
+        targets = qs[:, None, None] * cumulative[-1][None, None, :]
+        index = (cumulative[None, :, :] < targets).sum(axis=1)
+        index = np.minimum(index, len(items) - 1)
+        return np.take_along_axis(sorted_items, index, axis=0)
+
+    def to_arrays(self):
+        return {'count': np.array(self.count), 'levels': np.array(len(self.levels)),
+                **{f'level{i}': items for i, items in enumerate(self.levels)}}
+
+    @classmethod
+    def from_arrays(cls, arrays, columns, k=128):
+        sketch = cls(columns, k)
+        sketch.count = int(arrays['count'])
+        sketch.levels = [np.asarray(arrays[f'level{i}'], dtype=np.float32)
+                         for i in range(int(arrays['levels']))]
+        return sketch
+
+
+class QuantileSketchStore:
+    """시간 버킷별 분위수 스케치
+
+    최근 keep_hourly_days 일은 시간 단위, keep_daily_days 일까지는 일 단위,
+    그 이전은 월 단위로 합쳐 보관하므로 개수가 기간에 비례해 늘지 않는다.
+    저장은 날짜(시간 단위)/월(일 단위)별 파일로 나누어 바뀐 파일만 다시 쓴다.
+    """
+
+    def __init__(self, columns, k=128, keep_hourly_days=7, keep_daily_days=60):
+        self.columns = columns
+        self.k = k
+        self.keep_hourly_days = keep_hourly_days
+        self.keep_daily_days = keep_daily_days
+        self.hourly = {}    # 'YYYY-MM-DD HH' -> 스케치
+        self.daily = {}     # 'YYYY-MM-DD' -> 스케치 (시간 단위 보관 기간이 지난 날)
+        self.monthly = {}   # 'YYYY-MM' -> 스케치 (일 단위 보관 기간이 지난 달)
+        self.dirty = set()  # 다시 저장할 파일 이름
+        self.legacy_path = None  # 예전 단일 .npz 파일 (다음 저장 후 삭제)
+
+    @staticmethod
+    def _group(prefix, key):
+        """버킷이 저장되는 파일 이름"""
+        if prefix == 'h':
+            return 'hour-' + key[:10]
+        if prefix == 'd':
+            return 'day-' + key[:7]
+        return 'month'
+
+    def _tiers(self):
+        return (('h', self.hourly), ('d', self.daily), ('m', self.monthly))
+
+    def process(self, timestamps, values):
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.columns))
+        keys = [datetime.fromtimestamp(t).strftime('%Y-%m-%d %H') for t in timestamps]
+        start = 0
+        for end in range(1, len(keys) + 1):
+            if end == len(keys) or keys[end] != keys[start]:
+                self._bucket(keys[start]).update(values[start:end])
+                self.dirty.add(self._group('h', keys[start]))
+                start = end
+        return values
+
+    def _bucket(self, key):
+        if key not in self.hourly:
+            self.hourly[key] = QuantileSketch(len(self.columns), self.k)
+            self._roll_up(key[:10])
+        return self.hourly[key]
+
+    def _merge_into(self, source, prefix, target, target_prefix, key_length, cutoff):
+        """cutoff 이전 버킷을 key_length 글자 키의 상위 단위 버킷으로 합침"""
+        for key in [key for key in source if key[:10] < cutoff]:
+            parent = key[:key_length]
+            if parent not in target:
+                target[parent] = QuantileSketch(len(self.columns), self.k)
+            target[parent].merge(source.pop(key))
+            self.dirty.add(self._group(prefix, key))
+            self.dirty.add(self._group(target_prefix, parent))
+
+    def _roll_up(self, today):
+        """보관 기간이 지난 시간 단위 스케치는 일 단위로, 일 단위는 월 단위로 합침"""
+        today = datetime.strptime(today, '%Y-%m-%d')
+        hourly_cutoff = (today - timedelta(days=self.keep_hourly_days)).strftime('%Y-%m-%d')
+        daily_cutoff = (today - timedelta(days=self.keep_daily_days)).strftime('%Y-%m-%d')
+        self._merge_into(self.hourly, 'h', self.daily, 'd', 10, hourly_cutoff)
+        self._merge_into(self.daily, 'd', self.monthly, 'm', 7, daily_cutoff)
+
+    def query(self, start, end):
+        """[start, end) 시간대 스케치를 합친 결과 (시간 단위로 정렬된 경계 사용)"""
+        first = datetime.fromtimestamp(start).strftime('%Y-%m-%d %H')
+        last = datetime.fromtimestamp(end).strftime('%Y-%m-%d %H')
+        merged = QuantileSketch(len(self.columns), self.k)
+        for key, sketch in self.hourly.items():
+            if first <= key <= last:
+                merged.merge(sketch)
+        for day, sketch in self.daily.items():
+            if first[:10] <= day <= last[:10]:
+                merged.merge(sketch)
+        for month, sketch in self.monthly.items():
+            if first[:7] <= month <= last[:7]:
+                merged.merge(sketch)
+        return merged
+
+    def quantiles(self, start, end, qs):
+        return self.query(start, end).quantiles(qs)
+
+    def save(self, directory):
+        """바뀐 버킷 파일만 다시 씀 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(directory, exist_ok=True)
+        groups = {group: {'columns': np.array(self.columns)} for group in self.dirty}
+        for prefix, buckets in self._tiers():
+            for key, sketch in buckets.items():
+                group = self._group(prefix, key)
+                if group in groups:
+                    for name, array in sketch.to_arrays().items():
+                        groups[group][f'{prefix}|{key}|{name}'] = array
+        for group, arrays in groups.items():
+            path = os.path.join(directory, group + '.npz')
+            if len(arrays) == 1:
+                if os.path.exists(path):
+                    os.remove(path)  # 상위 단위로 모두 합쳐짐
+                continue
+            with open(path + '.tmp', 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(path + '.tmp', path)
+        self.dirty.clear()
+        if self.legacy_path is not None and os.path.exists(self.legacy_path):
+            os.remove(self.legacy_path)
+        self.legacy_path = None
+
+    def _load_file(self, path):
+        """파일 하나의 버킷들을 읽음 (열 구성이 다르면 무시)"""
+        try:
+            data = np.load(path, allow_pickle=False)
+        except (FileNotFoundError, OSError, ValueError):
+            return False
+        with data:
+            if list(data['columns']) != list(self.columns):
+                return False
+            grouped = {}
+            for name in data.files:
+                if name == 'columns':
+                    continue
+                prefix, key, field = name.split('|')
+                grouped.setdefault((prefix, key), {})[field] = data[name]
+        tiers = dict(self._tiers())
+        for (prefix, key), arrays in grouped.items():
+            tiers[prefix][key] = QuantileSketch.from_arrays(arrays, len(self.columns), self.k)
+        return True
+
+    @classmethod
+    def load(cls, directory, columns, k=128, keep_hourly_days=7, keep_daily_days=60):
+        store = cls(columns, k, keep_hourly_days, keep_daily_days)
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith('.npz'):
+                    store._load_file(os.path.join(directory, name))
+        # 예전 형식: 모든 버킷을 담은 파일 하나
+        legacy_path = directory + '.npz'
+        if store._load_file(legacy_path):
+            store.legacy_path = legacy_path
+            store.dirty.update(store._group(prefix, key) for prefix, buckets in store._tiers()
+                               for key in buckets)
+        store._roll_up(datetime.now().strftime('%Y-%m-%d'))
+        return store
@@ -5,7 +5,7 @@ import json
 import socket
 import threading
 import queue
-from datetime import datetime
+from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
@@ -14,15 +14,31 @@ from PyQt5.QtWidgets import (QDialog,QApplication, QMainWindow, QWidget, QVBoxLa
                             QFormLayout, QTableWidget, QHBoxLayout,
                             QTableWidgetItem, QMessageBox, QSpinBox, QCheckBox,
                             QFileDialog, QComboBox, QDoubleSpinBox, QScrollArea,
-                            QGridLayout, QSystemTrayIcon, QMenu, QAction,QSizePolicy,QHeaderView)
-from PyQt5.QtCore import QTimer, QDate, pyqtSignal, QObject, Qt,QEvent
+                            QGridLayout, QSystemTrayIcon, QMenu, QAction,QSizePolicy,QHeaderView,
+                            QTableView, QDateEdit, QProgressDialog)
+from PyQt5.QtCore import (QTimer, QDate, pyqtSignal, QObject, Qt,QEvent, QAbstractTableModel,
+                          QModelIndex)
 from PyQt5.QtGui import QIcon, QColor
 import winreg
 import os
 import subprocess
 import matplotlib.animation as animation
 import time
+import numpy as np
 from PyQt5.QtWidgets import QMessageBox
+from sensor_stream import (PressurePyramid, RollingStats, SensorPipeline, SensorHealthMonitor,
+                           QuantileSketchStore, create_filter)
+from posture_storage import (RecordHistory, RecordLog, RecordDatabase, DayPartitionedStore,
+                             RecordBuffer, make_record, format_record, posture_status,
+                             PostureEventStore, make_event,
+                             PostureSessionStore, make_session, PostureAlertLog,
+                             format_time, FrameArchive, WriteBehindWriter, RollupStore,
+                             JsonSnapshotFile, export_csv, export_columnar)
+from posture_analysis import (SensorCalibration, CalibrationCapture, BaselineNormalizer,
+                              FeatureExtractor, SENSOR_COLS, SENSOR_ROWS, SENSOR_X, SENSOR_Y,
+                              GRID_SIZE, PostureStateMachine, PostureSessionizer)
+from posture_classifier import load_classifier, classify_features
+from posture_migrate import migrate_legacy_stats, checkpoint_path
 
 class SingleInstance:
     def __init__(self, port=12345):
@@ -162,12 +178,105 @@ class UserInfoDialog(QDialog):
         self.settings.user_height = self.height_input.value()
         self.settings.user_gender = self.gender_input.currentText()
         self.settings.user_age = self.age_input.value()
-        self.settings.save_settings()
+        self.settings.write_settings()  # 초기 설정은 바로 저장
         
         self.accept()
 
 
 
+# 내보내기 조건 입력 (기간, 자세)
+class ExportDialog(QDialog):
+    def __init__(self, days, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('데이터 내보내기')
+        self.setModal(True)
+
+        form_layout = QFormLayout()
+        first_day = QDate.fromString(days[0], 'yyyy-MM-dd') if days else QDate.currentDate()
+        self.start_input = QDateEdit(first_day)
+        self.start_input.setCalendarPopup(True)
+        self.end_input = QDateEdit(QDate.currentDate())
+        self.end_input.setCalendarPopup(True)
+        self.posture_input = QSpinBox()
+        self.posture_input.setRange(-1, 255)
+        self.posture_input.setSpecialValueText('전체')
+        self.posture_input.setValue(-1)
+        form_layout.addRow('시작 날짜:', self.start_input)
+        form_layout.addRow('끝 날짜:', self.end_input)
+        form_layout.addRow('자세:', self.posture_input)
+
+        button_layout = QHBoxLayout()
+        confirm_button = QPushButton('확인')
+        confirm_button.clicked.connect(self.accept)
+        cancel_button = QPushButton('취소')
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(confirm_button)
+        button_layout.addWidget(cancel_button)
+
+        main_layout = QVBoxLayout()
+        main_layout.addLayout(form_layout)
+        main_layout.addLayout(button_layout)
+        self.setLayout(main_layout)
+
+    def conditions(self):
+        """(시작, 끝) epoch 초와 자세 (전체면 None)"""
+        start = datetime.combine(self.start_input.date().toPyDate(), datetime.min.time())
+        end = datetime.combine(self.end_input.date().toPyDate(), datetime.min.time()) + timedelta(days=1)
+        posture = self.posture_input.value()
+        return start.timestamp(), end.timestamp(), (None if posture < 0 else posture)
+
+
+# 내보내기를 백그라운드 스레드에서 실행 (진행률은 시그널로 전달)
+class ExportWorker(QObject):
+    progress = pyqtSignal(int)  # 진행률 (%)
+    finished = pyqtSignal(object)  # 저장한 행 수 (취소되면 None)
+    failed = pyqtSignal(str)
+
+    def __init__(self, export, *args):
+        super().__init__()
+        self.export = export
+        self.args = args
+        self.cancelled = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self):
+        try:
+            rows = self.export(*self.args,
+                               progress=lambda done, total: self.progress.emit(done * 100 // max(total, 1)),
+                               cancel=self.cancelled.is_set)
+            self.finished.emit(rows)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+# 예전 JSON 기록 이전을 백그라운드 스레드에서 실행 (체크포인트마다 진행률 전달)
+class MigrationWorker(QObject):
+    progress = pyqtSignal(int, int)  # 진행률 (%), 옮긴 기록 수
+    finished = pyqtSignal(object)  # 알릴 내용 (없으면 None)
+
+    def __init__(self, settings, store):
+        super().__init__()
+        self.settings = settings
+        self.store = store
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            message = self.settings.import_legacy_stats(
+                self.store,
+                progress=lambda rows, done, total: self.progress.emit(done * 100 // max(total, 1), rows))
+        except Exception as e:
+            message = f'예전 기록 이전 실패: {e}'
+        self.finished.emit(message)
+
+
 def check_initial_setup(settings):
     """사용자 정보가 설정되어 있는지 확인"""
     if (settings.user_weight == 0 or 
@@ -186,12 +295,117 @@ class MplCanvas(FigureCanvas):
         super().__init__(fig)
         fig.tight_layout()
 
+# 기록 테이블 모델
+# 보이는 행만 문자열로 변환하고, 이전 기록은 스크롤할 때 페이지 단위로 읽는다.
+class RecordTableModel(QAbstractTableModel):
+    HEADERS = ['시간', '자세 상태', '압력값', '예측 자세']
+    PAGE_SIZE = 200
+    MAX_ROWS = 50000  # 실시간 보기에서 이보다 많아지면 오래된 행부터 내림
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = RecordBuffer()
+        self.source = None  # (start, stop) -> 기록 배열
+        self.lower = 0  # 읽을 수 있는 가장 앞 위치
+        self.first_position = 0  # 첫 행의 저장소 위치
+        self.colors = {'양호': QColor('lightgreen'), '불량': QColor('pink')}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.records[index.row()]
+        if role == Qt.DisplayRole:
+            return format_record(record)[index.column()]
+        if role == Qt.BackgroundRole:
+            return self.colors[posture_status(int(record['posture']))]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def load(self, source, lower, upper):
+        """[lower, upper) 구간 중 가장 최근 페이지만 읽어 표시"""
+        self.beginResetModel()
+        self.source = source
+        self.lower = lower
+        self.first_position = max(lower, upper - self.PAGE_SIZE)
+        self.records = RecordBuffer(source(self.first_position, upper))
+        self.endResetModel()
+
+    def has_older(self):
+        return self.first_position > self.lower
+
+    def fetch_older(self):
+        """이전 페이지를 맨 위에 추가. 추가한 행 수를 반환"""
+        if not self.has_older():
+            return 0
+        start = max(self.lower, self.first_position - self.PAGE_SIZE)
+        older = self.source(start, self.first_position)
+        if len(older) == 0:
+            return 0
+        self.beginInsertRows(QModelIndex(), 0, len(older) - 1)
+        self.records = RecordBuffer(np.concatenate([older, self.records.records]))
+        self.first_position = start
+        self.endInsertRows()
+        return len(older)
+
+    def append(self, record):
+        row = len(self.records)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.records.append(record)
+        self.endInsertRows()
+        if len(self.records) > self.MAX_ROWS:
+            self.drop_oldest(len(self.records) - self.MAX_ROWS + self.PAGE_SIZE)
+
+    def drop_oldest(self, count):
+        self.beginRemoveRows(QModelIndex(), 0, count - 1)
+        self.records = RecordBuffer(self.records.records[count:])
+        self.first_position += count
+        self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.records = RecordBuffer()
+        self.source = None
+        self.lower = self.first_position = 0
+        self.endResetModel()
+
 # 설정
 class Settings:
+    SAVE_DELAY_MS = 500  # 연속 변경을 한 번의 저장으로 모으는 시간
+
     def __init__(self):
         # json 파일 만들기
         self.settings_file = 'app_settings.json'
-        self.stats_file = 'posture_stats.json'
+        self.stats_file = 'posture_stats.json'  # 예전 형식 (처음 실행 시 로그로 옮김)
+        self.stats_log_file = 'posture_stats.bin'  # 예전 단일 기록 로그
+        self.stats_db_file = 'posture_stats.db'  # 예전 단일 SQLite 저장소
+        self.stats_history_dir = 'posture_history'  # 날짜별 기록 조각과 목록
+        self.rollups_dir = 'posture_rollups'  # 분/시간/일 단위 요약
+        self.calibration_file = 'sensor_calibration.json'
+        self.baseline_file = 'user_baseline.json'
+        self.health_log_file = 'sensor_health.log'
+        self.durations_file = 'posture_durations.json'
+        self.events_file = 'posture_events.bin'
+        self.sessions_file = 'posture_sessions.bin'
+        self.alerts_file = 'posture_alerts.bin'
+        self.sketches_dir = 'pressure_sketches'  # 시간/일/월 단위 분위수 스케치
+        self.raw_archive_dir = 'raw_frames'  # 날짜별 원본 센서 프레임
+        self.saved_state = None  # 마지막으로 파일에 쓴 설정
+        self.settings_sink = JsonSnapshotFile(self.settings_file)
+        self.writer = None  # 있으면 설정 파일 쓰기를 저장 스레드로 보냄
+        self.save_timer = QTimer()
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(self.SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.write_settings)
         self.load_settings()
         
         #데이터 값 가져오기
@@ -199,7 +413,8 @@ class Settings:
         try:
             with open(self.settings_file, 'r') as f:
                 settings = json.load(f)
-        except FileNotFoundError:
+            self.saved_state = settings
+        except (FileNotFoundError, json.JSONDecodeError):
             settings = self.get_default_settings()
         
         
@@ -216,9 +431,20 @@ class Settings:
         self.user_gender = settings.get('user_gender', '')
         self.user_age = settings.get('user_age', 0)
         self.bad_posture_alert_active = settings.get('bad_posture_alert_active', True)
-
-    def save_settings(self):
-        settings = {
+        self.sensor_filter = settings.get('sensor_filter', 'none')
+        self.history_hot_limit = settings.get('history_hot_limit', 10000)
+        self.stats_backend = settings.get('stats_backend', 'sqlite')
+        self.raw_archive = settings.get('raw_archive', True)
+        self.fsync_policy = settings.get('fsync_policy', 'periodic')
+        # 보관 기간 (일, 0이면 계속 보관). 일 단위 요약은 항상 보관
+        self.raw_retention_days = settings.get('raw_retention_days', 90)
+        self.minute_retention_days = settings.get('minute_retention_days', 180)
+        self.hour_retention_days = settings.get('hour_retention_days', 730)
+        self.classifier_model = settings.get('classifier_model', '')
+
+    def as_dict(self):
+        """현재 설정 (메모리 값)"""
+        return {
             'autostart': self.autostart,
             'background_execution': self.background_execution,  # 추가
             'toast_interval': self.toast_interval,
@@ -227,28 +453,86 @@ class Settings:
             'bad_posture_alert_active': self.bad_posture_alert_active,
             'host': self.host,
             'port': self.port,
-            'saved_servers': self.saved_servers,
+            'saved_servers': list(self.saved_servers),  # 저장 스레드가 쓰는 동안 바뀌지 않도록 복사
             'user_weight': self.user_weight,
             'user_height': self.user_height,
             'user_gender': self.user_gender,
-            'user_age': self.user_age
+            'user_age': self.user_age,
+            'sensor_filter': self.sensor_filter,
+            'history_hot_limit': self.history_hot_limit,
+            'stats_backend': self.stats_backend,
+            'raw_archive': self.raw_archive,
+            'fsync_policy': self.fsync_policy,
+            'raw_retention_days': self.raw_retention_days,
+            'minute_retention_days': self.minute_retention_days,
+            'hour_retention_days': self.hour_retention_days,
+            'classifier_model': self.classifier_model
         }
-        with open(self.settings_file, 'w') as f:
-            json.dump(settings, f)
 
+    def save_settings(self):
+        """설정 저장 예약 (SAVE_DELAY_MS 안의 변경은 한 번에 저장)"""
+        self.save_timer.start()
+
+    def write_settings(self):
+        """설정 파일을 임시 파일에 쓴 뒤 교체 (쓰는 도중 종료되어도 기존 파일 유지)
 
-    def load_stats(self):
-        """저장된 자세 기록 데이터 로드"""
+        writer 가 있으면 쓰기와 fsync 는 저장 스레드에서 처리한다.
+        """
+        self.save_timer.stop()
+        settings = self.as_dict()
+        if settings == self.saved_state:
+            return
+        if self.writer is not None:
+            self.writer.submit(self.settings_sink, settings)
+        else:
+            self.settings_sink.extend([settings])
+        self.saved_state = settings
+
+
+    def load_stats(self, writer=None):
+        """저장된 자세 기록 데이터 로드 (날짜별 저장소의 끝부분만 읽음)"""
+        store = DayPartitionedStore(self.stats_history_dir, self.stats_backend)
+        if len(store) == 0:
+            for path, store_class in [(self.stats_db_file, RecordDatabase),
+                                      (self.stats_log_file, RecordLog)]:
+                if os.path.exists(path):
+                    self.import_record_store(store, store_class(path), path)
+            store.flush()
+        return RecordHistory(store, self.history_hot_limit, writer=writer)
+
+    def import_record_store(self, store, source, path):
+        """예전 단일 저장소의 기록을 날짜별 저장소로 옮기고 원본은 .bak 으로 보관"""
+        for chunk in source.iter_chunks(100000):
+            store.extend(chunk)
+        source.close()
+        os.replace(path, path + '.bak')
+
+    def has_legacy_stats(self):
+        """옮길 예전 posture_stats.json 이 남아 있는지 (이전 중에 끊긴 경우 포함)"""
+        return os.path.exists(self.stats_file)
+
+    def import_legacy_stats(self, store, progress=None):
+        """예전 posture_stats.json 기록을 저장소로 옮기고 원본은 .bak 으로 보관
+
+        MigrationWorker 스레드에서 호출된다. 실패하거나 파일 끝이 잘려 있었으면
+        알릴 내용을, 아니면 None 을 반환.
+        """
         try:
-            with open(self.stats_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+            result = migrate_legacy_stats(self.stats_file, store, progress=progress)
+        except (OSError, ValueError) as e:
+            # 원본과 체크포인트는 그대로 두므로 다음 실행 때 이어서 시도
+            return f'예전 기록({self.stats_file}) 이전 실패: {e}'
+        message = None
+        if result['truncated']:
+            message = (f'예전 기록({self.stats_file}) 끝이 잘려 있어 '
+                       f'온전한 {result["rows"]}개까지 옮겼습니다.')
+        os.replace(self.stats_file, self.stats_file + '.bak')
+        os.remove(checkpoint_path(self.stats_file))
+        return message
 
     def save_stats(self, stats):
-        """자세 기록 데이터 저장"""
-        with open(self.stats_file, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
+        """버퍼에 남은 기록을 저장소에 기록"""
+        stats.flush()
 
     def get_default_settings(self):
         return {
@@ -262,7 +546,16 @@ class Settings:
             'user_weight': 0.0,
             'user_height': 0.0,
             'user_gender': '',
-            'user_age': 0
+            'user_age': 0,
+            'sensor_filter': 'none',
+            'history_hot_limit': 10000,
+            'stats_backend': 'sqlite',
+            'raw_archive': True,
+            'fsync_policy': 'periodic',
+            'raw_retention_days': 90,
+            'minute_retention_days': 180,
+            'hour_retention_days': 730,
+            'classifier_model': ''
         }
     
     def add_saved_server(self, host, port):
@@ -363,6 +656,9 @@ class DataReceiver(QObject):
                 break
 
 class PostureMonitorApp(QMainWindow):
+    # 분포를 기록할 자세 특징
+    SKETCH_FEATURES = ['total', 'contact', 'cop_x', 'cop_y', 'lr_balance', 'fb_balance']
+
     def __init__(self):
         super().__init__()
         self.settings = Settings()
@@ -379,13 +675,50 @@ class PostureMonitorApp(QMainWindow):
         self.notification_active = True
         self.max_data_points = 100
         self.current_start_index = 0
-        self.stats_data = self.settings.load_stats() or []
+        self.pressure_pyramid = PressurePyramid()  # 장시간 그래프용 다중 해상도 요약
+        self.rolling_stats = RollingStats(window=self.max_data_points)  # 채널별 이동 통계
+        self.health_monitor = SensorHealthMonitor(self.sensor_names)  # 센서 고장 감시
+        self.calibration = SensorCalibration.load(self.settings.calibration_file)  # ADC -> 하중
+        self.calibration_capture = CalibrationCapture()
+        self.baseline = BaselineNormalizer.load(self.settings.baseline_file,
+                                                self.settings.user_weight, self.calibration.unit)
+        self.feature_extractor = FeatureExtractor()
+        self.latest_features = None  # 최신 프레임의 압력 중심/균형/접촉 특징
+        self.classifier = None  # 로컬 자세 분류기 (없으면 서버 예측 사용)
+        self.posture_state = PostureStateMachine()  # 예측 노이즈에 흔들리지 않는 자세 상태
+        self.shown_posture = None
+        self.sessionizer = PostureSessionizer.load(self.settings.durations_file)  # 세션/자세별 시간
+        self.event_store = PostureEventStore(self.settings.events_file)  # 자세 구간 기록
+        self.session_store = PostureSessionStore(self.settings.sessions_file)  # 착석 세션 기록
+        self.alert_log = PostureAlertLog(self.settings.alerts_file)  # 나쁜 자세 전환 시각 (요약의 알림 수)
+        self.episode_features = None  # 진행 중인 자세 구간이 시작될 때의 특징
+        # 센서별/특징별 분포 (시간 버킷별 분위수 스케치)
+        self.sketch_columns = self.sensor_names + self.SKETCH_FEATURES
+        self.sketches = QuantileSketchStore.load(self.settings.sketches_dir, self.sketch_columns)
+        # 기록 저장은 별도 스레드에서 묶음으로 처리
+        self.writer = WriteBehindWriter(fsync=self.settings.fsync_policy)
+        self.settings.writer = self.writer
+        self.frame_archive = FrameArchive(self.settings.raw_archive_dir,
+                                          writer=self.writer)  # 원본 프레임 보관
+        self.load_local_classifier()
+        self.build_sensor_pipeline()
+        self.graph_span = 0  # 0이면 최근 원본 데이터 표시
+        self.stats_data = self.settings.load_stats(self.writer)
+        # 분/시간/일 단위 요약 (백그라운드에서 주기적으로 갱신)
+        self.rollups = RollupStore(self.settings.rollups_dir, retention_days={
+            'minute': self.settings.minute_retention_days,
+            'hour': self.settings.hour_retention_days})
+        self.rollup_thread = None
+        self.migration_worker = None  # 예전 기록 이전 (진행 중일 때만)
         
         plt.rcParams['font.family'] = 'Malgun Gothic'
 
         self.initUI()
+        self.refresh_stats_days()
         self.load_saved_stats()
         self.showMaximized()
+        if self.settings.has_legacy_stats():
+            self.start_legacy_migration()
         
         self.data_receiver.data_received.connect(self.handle_new_data)
         self.data_receiver.error_occurred.connect(self.handle_error)
@@ -398,6 +731,11 @@ class PostureMonitorApp(QMainWindow):
         self.notification_timer.timeout.connect(self.check_notification)
         self.notification_timer.start(1000)
 
+        self.rollup_timer = QTimer()
+        self.rollup_timer.timeout.connect(self.run_rollup_job)
+        self.rollup_timer.start(60000)  # 1분마다 요약
+        self.run_rollup_job()
+
 
     def create_tray_icon(self):
         # 시스템 트레이 아이콘 생성
@@ -421,23 +759,59 @@ class PostureMonitorApp(QMainWindow):
 
 
     def load_saved_stats(self):
-        """저장된 기록 불러오기"""
-        stats = self.settings.load_stats()
-        for stat in stats:
-            row_position = self.stats_table.rowCount()
-            self.stats_table.insertRow(row_position)
-            
-            self.stats_table.setItem(row_position, 0, QTableWidgetItem(stat['time']))
-            self.stats_table.setItem(row_position, 1, QTableWidgetItem(stat['status']))
-            self.stats_table.setItem(row_position, 2, QTableWidgetItem(stat['sensor_values']))
-            self.stats_table.setItem(row_position, 3, QTableWidgetItem(str(stat['predicted_posture'])))  # int를 문자열로 변환
-            
-            # 상태에 따라 배경색 설정
-            color = 'pink' if stat['status'] == '불량' else 'lightgreen'
-            for col in range(4):  # 0부터 3까지 (모든 열 포함)
-                self.stats_table.item(row_position, col).setBackground(QColor(color))
+        """최근 기록 한 페이지만 불러오기 (이전 기록은 스크롤할 때 읽음)"""
+        self.stats_model.load(self.stats_data.read, 0, len(self.stats_data))
+        self.update_stats_summary()
+
+    def update_stats_summary(self):
+        self.stats_summary_label.setText(
+            f'전체 기록 {len(self.stats_data)}개, {len(self.stats_data.days())}일')
+
+    def on_stats_scrolled(self, value):
+        """맨 위까지 스크롤하면 이전 페이지를 읽어 위에 붙임"""
+        if value > self.stats_table.verticalScrollBar().minimum():
+            return
+        added = self.stats_model.fetch_older()
+        if added:
+            # 보던 행이 그대로 보이도록 위치 유지
+            self.stats_table.scrollTo(self.stats_model.index(added, 0), QTableView.PositionAtTop)
+
+    def refresh_stats_days(self):
+        """날짜 목록 갱신 (선택은 유지)"""
+        selected = self.stats_day_combo.currentData()
+        self.stats_day_combo.blockSignals(True)
+        self.stats_day_combo.clear()
+        self.stats_day_combo.addItem('실시간 (최근 기록)', None)
+        for day in reversed(self.stats_data.days()):
+            self.stats_day_combo.addItem(day, day)
+        index = self.stats_day_combo.findData(selected)
+        self.stats_day_combo.setCurrentIndex(max(index, 0))
+        self.stats_day_combo.blockSignals(False)
+        if index < 0 and selected is not None:
+            self.on_stats_day_changed(0)
+
+    def on_stats_day_changed(self, index):
+        """선택한 날짜의 기록만 표시 (실시간이면 최근 기록)"""
+        day = self.stats_day_combo.itemData(index)
+        self.drop_day_button.setEnabled(day is not None)
+        if day is None:
+            self.load_saved_stats()
+            return
+        self.stats_model.load(self.stats_data.read, *self.stats_data.day_range(day))
+
+    def drop_stats_day(self):
+        """선택한 날짜의 기록 삭제"""
+        day = self.stats_day_combo.currentData()
+        if day is None:
+            return
+        reply = QMessageBox.question(self, '날짜 삭제', f'{day} 기록을 삭제하시겠습니까?',
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.stats_data.drop_day(day)
+            self.refresh_stats_days()
+            self.statusBar().showMessage(f'{day} 기록이 삭제되었습니다.')
+
 
-        
     def check_notification(self):
         if not self.notification_active or not self.settings.toast_app:
             return
@@ -477,6 +851,13 @@ class PostureMonitorApp(QMainWindow):
         self.times = []
         self.current_start_index = 0
         self.pressure_data = {name: [] for name in self.sensor_names}
+        self.pressure_pyramid.clear()
+        self.rolling_stats.reset()
+        self.health_monitor.reset()
+        self.posture_state.reset()
+        self.shown_posture = None
+        self.record_posture_episodes(self.sessionizer.close_stream())
+        self.build_sensor_pipeline()
         
         # 모든 그래프 캔버스 초기화
         for sensor_name, canvas in self.canvases.items():
@@ -503,21 +884,107 @@ class PostureMonitorApp(QMainWindow):
         # 센서 데이터 처리
         sensor_values = data.get('sensor_data', {})
         
-        # 각 센서 데이터 처리
-        for sensor_name in self.sensor_names:
-            value = sensor_values.get(sensor_name, 0)
+        # 각 센서 데이터 처리 (필터 적용 후 그래프와 기록에 사용)
+        frame = [sensor_values.get(sensor_name, 0) for sensor_name in self.sensor_names]
+        timestamps = [time.time()]
+        if self.settings.raw_archive:
+            self.frame_archive.append(timestamps[0], frame)
+        filtered_batch = self.sensor_pipeline.process(timestamps, [frame])
+        was_learning = self.baseline.learning
+        self.analysis_pipeline.process(timestamps, filtered_batch)
+        self.latest_features = self.feature_extractor.latest[0]
+        features = self.feature_extractor.latest
+        self.sketches.process(timestamps, np.column_stack(
+            [filtered_batch] + [features[name] for name in self.SKETCH_FEATURES]))
+        if was_learning and not self.baseline.learning:
+            self.baseline.save(self.settings.baseline_file)
+        filtered = filtered_batch[0]
+        health_events = self.health_monitor.take_events()
+        if health_events:
+            self.handle_health_events(health_events)
+        sensor_values = {}
+        for sensor_name, value in zip(self.sensor_names, filtered.tolist()):
             self.pressure_data[sensor_name].append(value)
+            sensor_values[sensor_name] = value
         
-        # 자세 상태 업데이트
-        predicted_posture = data.get('predicted_posture', 0)
-        self.update_posture_status(predicted_posture)
-        self.log_posture_data(sensor_values, predicted_posture)
+        # 자세 상태 업데이트 (로컬 분류기가 있으면 직접 분류, 기준 하중 대비로 착석 판단)
+        if self.classifier is not None:
+            if features['total'][0] < self.baseline.OCCUPIED_RATIO:
+                predicted_posture = 0
+            else:
+                predicted_posture = int(classify_features(self.classifier, features)[0])
+        else:
+            predicted_posture = int(data.get('predicted_posture', 0))
+            if not 0 <= predicted_posture <= 255:
+                predicted_posture = 255  # 기록은 1바이트이므로 범위 밖 번호는 알 수 없는 나쁜 자세로
+        self.update_posture_status(timestamps[0], predicted_posture)
+        # 자세 구간은 상태 머신이 정한 자세가 바뀔 때만 나눔 (예측 노이즈마다 나누지 않음)
+        self.record_posture_episodes(self.sessionizer.update(
+            timestamps[0], predicted_posture, self.posture_state.state_posture))
+        self.log_posture_data(timestamps[0], sensor_values, predicted_posture)
 
 
     
+    def handle_health_events(self, events):
+        """센서 상태 변화 표시 및 기록"""
+        lines = []
+        for event in events:
+            issue = SensorHealthMonitor.ISSUE_NAMES[event['issue']]
+            state = '발생' if event['active'] else '해제'
+            lines.append(f'{event["sensor"]} {issue} {state}')
+
+        try:
+            with open(self.settings.health_log_file, 'a', encoding='utf-8') as f:
+                stamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                for line in lines:
+                    f.write(f'{stamp} {line}\n')
+        except OSError as e:
+            print(f"Error writing health log: {e}")
+
+        problems = self.health_monitor.problems()
+        if problems:
+            text = ', '.join(f'{sensor} {SensorHealthMonitor.ISSUE_NAMES[issue]}'
+                             for sensor, issue in problems)
+            self.sensor_health_label.setText(f'센서 상태: {text}')
+            self.sensor_health_label.setStyleSheet('color: red')
+        else:
+            self.sensor_health_label.setText('센서 상태: 정상')
+            self.sensor_health_label.setStyleSheet('color: green')
+        self.statusBar().showMessage('센서 상태 변경: ' + ', '.join(lines))
+
+    def build_sensor_pipeline(self):
+        """센서 감시 -> 필터 -> 보정 측정 -> 이동 통계 -> 다중 해상도 요약 순서로 파이프라인 구성"""
+        stages = [self.health_monitor]  # 고장 감시는 필터 전 원본 값으로
+        sensor_filter = create_filter(self.settings.sensor_filter)
+        if sensor_filter is not None:
+            stages.append(sensor_filter)
+        stages += [self.calibration_capture, self.rolling_stats, self.pressure_pyramid]
+        self.sensor_pipeline = SensorPipeline(stages)
+
+        # 분석용: ADC -> 하중 보정 -> 사용자 기준 하중 정규화 -> 특징 계산
+        self.baseline.set_profile(self.settings.user_weight, self.calibration.unit)
+        self.analysis_pipeline = SensorPipeline([self.calibration, self.baseline,
+                                                 self.feature_extractor])
+
+    def on_sensor_filter_changed(self, index):
+        self.settings.sensor_filter = self.sensor_filter_combo.itemData(index)
+        self.settings.save_settings()
+        self.build_sensor_pipeline()
+
     def update_graphs(self):
+        error = self.writer.take_error()
+        if error:
+            self.statusBar().showMessage(error)
+
         if not self.data_receiver.socket:
             return
+
+        self.update_live_stats_label()
+        self.update_pressure_map()
+
+        if self.graph_span:
+            self.update_summary_graphs()
+            return
             
         for sensor_name, canvas in self.canvases.items():
             if self.pressure_data[sensor_name] and len(self.pressure_data[sensor_name]) > 0:
@@ -541,24 +1008,233 @@ class PostureMonitorApp(QMainWindow):
                 
                 canvas.draw()
 
+    def update_summary_graphs(self):
+        """장시간 구간은 그래프 폭에 맞는 해상도의 요약 데이터로 표시"""
+        end = time.time()
+        start = end - self.graph_span
+        width = max(canvas.width() for canvas in self.canvases.values())
+        summary = self.pressure_pyramid.query(start, end, max(width, 50))
+        if len(summary['time']) == 0:
+            return
+
+        x_data = (summary['time'] - end) / 60  # 현재 기준 분 단위
+        for i, (sensor_name, canvas) in enumerate(self.canvases.items()):
+            canvas.axes.clear()
+            canvas.axes.fill_between(x_data, summary['min'][:, i], summary['max'][:, i],
+                                     color='b', alpha=0.2, linewidth=0)
+            canvas.axes.plot(x_data, summary['mean'][:, i], 'b-')
+            canvas.axes.set_title(f'센서 {sensor_name}')
+            canvas.axes.set_xlim(-self.graph_span / 60, 0)
+            canvas.axes.set_ylim(0, 1024)
+            canvas.axes.grid(True)
+            canvas.axes.set_xlabel('시간 (분)')
+            canvas.axes.set_ylabel('압력')
+            canvas.draw()
+
+    def update_live_stats_label(self):
+        """이동 통계 요약 표시"""
+        if self.rolling_stats.count == 0:
+            return
+        stats = self.rolling_stats.snapshot()
+        peak_channel = int(stats['mean'].argmax())
+        text = (
+            f'최근 {stats["count"]}개 평균 총 압력: {stats["mean"].sum():.1f}  '
+            f'(최대 평균 센서: {self.sensor_names[peak_channel]} {stats["mean"][peak_channel]:.1f}, '
+            f'변동: {stats["std"][peak_channel]:.1f})'
+        )
+        if not self.calibration.is_identity:
+            total_load = self.calibration.apply(stats['mean']).sum()
+            text += f'  총 하중: {total_load:.1f} {self.calibration.unit}'
+        if self.baseline.learning:
+            text += f'  기준 자세 학습 중 ({self.baseline.count}/{self.baseline.learn_samples})'
+        self.live_stats_label.setText(text)
+        self.update_calibration_status()
+
+    def update_pressure_map(self):
+        """4x4 매트 압력 분포와 압력 중심 표시"""
+        if self.latest_features is None:
+            return
+        features = self.latest_features
+        frame = np.zeros((GRID_SIZE, GRID_SIZE))
+        for i, sensor_name in enumerate(self.sensor_names):
+            frame[SENSOR_ROWS[i], SENSOR_COLS[i]] = self.pressure_data[sensor_name][-1]
+
+        axes = self.pressure_map_canvas.axes
+        axes.clear()
+        axes.imshow(frame, cmap='Reds', vmin=0, vmax=1024, extent=(-1.33, 1.33, 1.33, -1.33))
+        for i, sensor_name in enumerate(self.sensor_names):
+            axes.text(SENSOR_X[i], SENSOR_Y[i], sensor_name, ha='center', va='center', fontsize=7)
+        if features['total'] > 0:
+            axes.plot(features['cop_x'], features['cop_y'], 'bo')
+        axes.set_xticks([])
+        axes.set_yticks([])
+        self.pressure_map_canvas.draw()
+
+        self.features_label.setText(
+            f'압력 중심: ({features["cop_x"]:+.2f}, {features["cop_y"]:+.2f})\n'
+            f'좌우 균형: {features["lr_balance"]:+.2f}\n'
+            f'앞뒤 균형: {features["fb_balance"]:+.2f}\n'
+            f'접촉 센서: {features["contact"]}개\n'
+            f'착석 하중: 기준 대비 {features["total"] * 100:.0f}%\n'
+            f'최대 압력: {self.sensor_names[features["peak"]]}'
+        )
+
+    def start_calibration_step(self):
+        """기준 하중을 올린 상태에서 보정 측정 시작"""
+        if not self.data_receiver.socket:
+            QMessageBox.warning(self, '보정 오류', '장치를 먼저 연결해주세요.')
+            return
+        self.calibration_capture.start_step(self.calibration_load_input.value())
+        self.update_calibration_status()
+
+    def save_calibration(self):
+        if len(self.calibration_capture.steps) < 2:
+            QMessageBox.warning(self, '보정 오류', '서로 다른 하중으로 2단계 이상 측정해주세요.')
+            return
+        capture = self.calibration_capture
+        calibration = capture.build()
+        if len(capture.rejected) == capture.channels:
+            QMessageBox.warning(self, '보정 오류', '하중을 올려도 값이 오른 센서가 없습니다.')
+            return
+        self.calibration = calibration
+        self.calibration.save(self.settings.calibration_file)
+        self.calibration_capture = CalibrationCapture()
+        self.build_sensor_pipeline()
+        self.update_calibration_status()
+        if capture.rejected:
+            names = ', '.join(self.sensor_names[channel] for channel in capture.rejected)
+            QMessageBox.warning(self, '보정 경고',
+                                f'하중을 받지 않은 센서는 보정되지 않았습니다: {names}\n'
+                                '해당 센서 위에도 하중을 올려 다시 측정해주세요.')
+        self.statusBar().showMessage('센서 보정이 저장되었습니다.')
+
+    def relearn_baseline(self):
+        """바른 자세로 앉은 상태에서 기준 자세 다시 학습"""
+        self.baseline.reset()
+        self.baseline.save(self.settings.baseline_file)
+        self.statusBar().showMessage('기준 자세를 다시 학습합니다. 바르게 앉아주세요.')
+
+    def reset_calibration(self):
+        self.calibration = SensorCalibration()
+        self.calibration.save(self.settings.calibration_file)
+        self.calibration_capture = CalibrationCapture()
+        self.build_sensor_pipeline()
+        self.update_calibration_status()
+
+    def update_calibration_status(self):
+        capture = self.calibration_capture
+        if capture.capturing:
+            text = f'{capture.current_load:.1f} kg 측정 중... ({capture.progress}/{capture.samples_per_step})'
+        else:
+            text = f'측정된 단계: {len(capture.steps)}개'
+        unit = '보정 안 됨' if self.calibration.is_identity else self.calibration.unit
+        self.calibration_status_label.setText(f'{text}  (현재 단위: {unit})')
+
+    def on_graph_span_changed(self, index):
+        self.graph_span = self.graph_span_combo.itemData(index)
+        self.update_graphs()
+
     def handle_error(self, error_message):
         QMessageBox.warning(self, '오류', error_message)
 
+    def start_legacy_migration(self):
+        """예전 JSON 기록을 백그라운드에서 옮김 (중간에 종료해도 다음 실행 때 체크포인트부터 이어감)"""
+        self.migration_progress = QProgressDialog('예전 기록을 옮기는 중...', None, 0, 100, self)
+        self.migration_progress.setWindowTitle('기록 이전')
+        self.migration_progress.setWindowModality(Qt.NonModal)
+        self.migration_progress.setMinimumDuration(0)
+        self.migration_worker = MigrationWorker(self.settings, self.stats_data.log)
+        self.migration_worker.progress.connect(self.on_migration_progress)
+        self.migration_worker.finished.connect(self.on_migration_finished)
+        self.migration_worker.start()
+
+    def on_migration_progress(self, percent, rows):
+        self.migration_progress.setValue(percent)
+        self.migration_progress.setLabelText(f'예전 기록을 옮기는 중... ({rows}개)')
+
+    def on_migration_finished(self, message):
+        self.migration_progress.reset()
+        self.migration_worker = None
+        # 옮긴 날짜가 실시간 기록 앞에 들어왔으므로 위치를 다시 계산하고 화면 갱신
+        self.stats_data.refresh()
+        self.refresh_stats_days()
+        self.on_stats_day_changed(self.stats_day_combo.currentIndex())
+        if message:
+            QMessageBox.warning(self, '기록 이전', message)
+        else:
+            self.statusBar().showMessage('예전 기록을 옮겼습니다.')
+
+    def run_rollup_job(self):
+        """보관 기간 정리 후 새 기록 요약을 백그라운드에서 시작"""
+        # 자세별 누적 시간과 분위수 스케치는 주기적으로 저장 (비정상 종료 시에도 당일 기록 유지)
+        self.sessionizer.prune(time.time())
+        self.sessionizer.save(self.settings.durations_file)
+        self.sketches.save(self.settings.sketches_dir)
+        if self.rollup_thread is not None and self.rollup_thread.is_alive():
+            return
+        if self.migration_worker is not None:
+            return  # 옮기는 중인 예전 날짜를 건너뛰고 요약하지 않도록 끝난 뒤에 시작
+        self.apply_retention()
+        self.rollup_thread = threading.Thread(target=self.rollups.update,
+                                              args=(self.stats_data.log, time.time(), self.alert_log),
+                                              daemon=True)
+        self.rollup_thread.start()
+
+    def apply_retention(self):
+        """보관 기간이 지난 원본 기록(요약이 끝난 날짜만)과 요약 행 삭제"""
+        self.rollups.apply_retention(time.time())
+        if self.settings.raw_retention_days <= 0:
+            return
+        cutoff = (datetime.now() - timedelta(days=self.settings.raw_retention_days)).strftime('%Y-%m-%d')
+        dropped = [day for day in self.stats_data.days()
+                   if day < cutoff and self.rollups.covers(day)]
+        for day in dropped:
+            self.stats_data.drop_day(day)
+        for day in self.frame_archive.days():
+            if day < cutoff:
+                self.frame_archive.drop_day(day)
+        if dropped:
+            self.refresh_stats_days()
+            # 위치가 바뀌었으므로 보던 화면을 다시 읽음
+            self.on_stats_day_changed(self.stats_day_combo.currentIndex())
+
+    def update_rollup_graph(self):
+        """선택한 기간의 자세별 사용 시간 (가장 큰 요약 단위부터 사용)"""
+        end = time.time()
+        totals = self.rollups.totals(end - self.rollup_period_combo.currentData(), end)
+        if totals['samples'] == 0:
+            return
+        hours = totals['posture_seconds'] / 3600
+        postures = np.flatnonzero(hours)
+
+        axes = self.rollup_canvas.axes
+        axes.clear()
+        axes.bar(postures, hours[postures])
+        axes.set_title(f'나쁜 자세 {totals["bad_seconds"] / 3600:.1f}시간, 알림 {totals["alerts"]}회')
+        axes.set_xlabel('자세')
+        axes.set_ylabel('사용 시간 (시간)')
+        axes.grid(True)
+        self.rollup_canvas.draw()
+
     def update_analysis_graphs(self):
-        # 저장된 데이터 로드
-        stats = self.settings.load_stats()
+        self.update_channel_stats_graph()
+        self.update_distribution_graph()
+        self.update_rollup_graph()
+
+        # 메모리에 있는 최근 기록
+        stats = self.stats_data.hot.records
         
-        if not stats:
+        if len(stats) == 0:
             return
         
         # 시간별 자세 변화 그래프
         self.time_series_canvas.axes.clear()
-        times = [stat['time'] for stat in stats]
-        postures = [stat['predicted_posture'] for stat in stats]
+        postures = stats['posture']
+        ticks = range(0, len(stats), max(1, len(stats)//10))
         
-        self.time_series_canvas.axes.plot(range(len(times)), postures, 'b-')
-        self.time_series_canvas.axes.set_xticks(range(0, len(times), max(1, len(times)//10)))
-        self.time_series_canvas.axes.set_xticklabels([times[i] for i in range(0, len(times), max(1, len(times)//10))], rotation=45)
+        self.time_series_canvas.axes.plot(range(len(stats)), postures, 'b-')
+        self.time_series_canvas.axes.set_xticks(ticks)
+        self.time_series_canvas.axes.set_xticklabels([format_record(stats[i])[0] for i in ticks], rotation=45)
         self.time_series_canvas.axes.set_ylabel('예측된 자세')
         self.time_series_canvas.axes.grid(True)
         self.time_series_canvas.draw()
@@ -566,75 +1242,181 @@ class PostureMonitorApp(QMainWindow):
         # 자세별 총 사용 시간 그래프
         self.duration_canvas.axes.clear()
         
-        # 자세별 카운트 계산
-        posture_counts = {}
-        for stat in stats:
-            posture = stat['predicted_posture']
-            posture_counts[posture] = posture_counts.get(posture, 0) + 1
+        # 오늘 자세별 사용 시간 (세션 분석기에서 누적 관리됨)
+        seconds = self.sessionizer.posture_seconds()
+        postures = np.flatnonzero(seconds)
+        minutes = seconds[postures] / 60
         
-        postures = list(posture_counts.keys())
-        counts = list(posture_counts.values())
-        
-        self.duration_canvas.axes.bar(postures, counts)
+        # 오늘 착석 시간 중 나쁜 자세 비율 (저장소를 훑지 않고 누적 합계에서 바로 계산)
+        day_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        bad_seconds = self.sessionizer.bad_seconds()
+        bad_ratio = bad_seconds / max(seconds.sum(), 1e-9)
+
+        # 오늘 착석 세션 (앉았다 일어난 횟수와 가장 오래 앉아 있던 시간)
+        sessions = self.session_store.query(day_start)
+        longest = (sessions['end'] - sessions['start']).max() / 60000 if len(sessions) else 0.0
+
+        self.duration_canvas.axes.bar(postures, minutes)
+        self.duration_canvas.axes.set_title(f'오늘 나쁜 자세: {bad_seconds / 60:.1f}분 '
+                                            f'(착석 중 {bad_ratio * 100:.0f}%), '
+                                            f'착석 {len(sessions)}회 (최장 {longest:.0f}분)')
         self.duration_canvas.axes.set_xlabel('자세')
-        self.duration_canvas.axes.set_ylabel('발생 횟수')
+        self.duration_canvas.axes.set_ylabel('사용 시간 (분)')
         self.duration_canvas.axes.grid(True)
         self.duration_canvas.draw()
 
-    def update_posture_status(self, predicted_posture):
-        current_time = time.time()
+    def update_distribution_graph(self):
+        """오늘 센서별 압력 분포 (중앙값/95% 분위수)"""
+        now = datetime.now()
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        today = self.sketches.query(day_start, now.timestamp())
+        if today.count == 0:
+            return
+        quantiles = today.quantiles([0.5, 0.95])
+        channels = len(self.sensor_names)
+        positions = range(channels)
+        contact_column = self.sketch_columns.index('contact')
+        hour_start = now.replace(minute=0, second=0, microsecond=0).timestamp()
+        hour_contact = self.sketches.quantiles(hour_start, now.timestamp(), [0.5])[0, contact_column]
+
+        axes = self.distribution_canvas.axes
+        axes.clear()
+        axes.bar(positions, quantiles[1, :channels], color='lightsteelblue', label='95%')
+        axes.bar(positions, quantiles[0, :channels], color='steelblue', label='중앙값')
+        axes.set_xticks(list(positions))
+        axes.set_xticklabels(self.sensor_names)
+        axes.set_ylim(0, 1024)
+        axes.set_ylabel('압력')
+        axes.set_title(f'이번 시간 접촉 센서 수 중앙값: {hour_contact:.0f}개')
+        axes.legend(loc='upper right')
+        axes.grid(True)
+        self.distribution_canvas.draw()
+
+    def update_channel_stats_graph(self):
+        """센서별 최근 평균/최소/최대 압력 그래프 (이동 통계 사용)"""
+        if self.rolling_stats.count == 0:
+            return
+        stats = self.rolling_stats.snapshot()
+        positions = range(len(self.sensor_names))
+
+        self.channel_stats_canvas.axes.clear()
+        self.channel_stats_canvas.axes.bar(positions, stats['mean'], yerr=stats['std'], capsize=2)
+        self.channel_stats_canvas.axes.plot(positions, stats['max'], 'r_', markersize=10)
+        self.channel_stats_canvas.axes.plot(positions, stats['min'], 'g_', markersize=10)
+        self.channel_stats_canvas.axes.set_xticks(list(positions))
+        self.channel_stats_canvas.axes.set_xticklabels(self.sensor_names)
+        self.channel_stats_canvas.axes.set_ylim(0, 1024)
+        self.channel_stats_canvas.axes.set_ylabel('압력')
+        self.channel_stats_canvas.axes.grid(True)
+        self.channel_stats_canvas.draw()
+
+    def update_archive_summary(self):
+        """선택한 기간의 원본 프레임 채널별 평균/최대 (매핑된 파일에서 바로 계산)"""
+        end = time.time()
+        if self.archive_period_combo.currentIndex() == 0:
+            start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        else:
+            start = end - self.archive_period_combo.currentData()
+        summary = self.frame_archive.channel_summary(start, end)
+        positions = range(len(self.sensor_names))
+
+        axes = self.archive_canvas.axes
+        axes.clear()
+        axes.bar(positions, summary['mean'], color='steelblue', label='평균')
+        axes.plot(positions, summary['max'], 'r_', markersize=10, label='최대')
+        axes.set_xticks(list(positions))
+        axes.set_xticklabels(self.sensor_names)
+        axes.set_ylim(0, 1024)
+        axes.set_ylabel('압력')
+        axes.set_title(f'프레임 {summary["count"]}개')
+        axes.legend(loc='upper right')
+        axes.grid(True)
+        self.archive_canvas.draw()
+
+    def record_posture_episodes(self, closed):
+        """끝난 자세 구간과 착석 세션을 저장 스레드로 보내 기록"""
+        intervals = [item for item in closed if item['type'] == 'interval']
+        for item in intervals:
+            self.writer.submit(self.event_store, make_event(item['start'], item['end'], item['from'],
+                                                            item['posture'], self.episode_features))
+        for item in closed:
+            if item['type'] == 'session':
+                self.writer.submit(self.session_store, make_session(item['start'], item['end'],
+                                                                    item['seated'], item['bad']))
+        if intervals or self.episode_features is None:
+            self.episode_features = self.latest_features
+
+    def search_episodes(self):
+        """조건에 맞는 자세 구간 검색"""
+        now = time.time()
+        period = self.episode_period_combo.currentData()
+        posture = self.episode_posture_input.value()
+        episodes = self.event_store.query(
+            posture=None if posture < 0 else posture,
+            start=None if period is None else now - period,
+            min_duration=self.episode_duration_input.value() * 60,
+        )
+
+        self.episode_table.setRowCount(0)
+        for episode in episodes[::-1][:1000]:  # 최근 구간부터 최대 1000개
+            row_position = self.episode_table.rowCount()
+            self.episode_table.insertRow(row_position)
+            duration = (int(episode['end']) - int(episode['start'])) / 60000
+            row = [
+                format_time(int(episode['start']), '%Y-%m-%d %H:%M:%S'),
+                f'{duration:.1f}',
+                str(episode['from_posture']),
+                str(episode['posture']),
+            ]
+            for col, text in enumerate(row):
+                self.episode_table.setItem(row_position, col, QTableWidgetItem(text))
+        self.statusBar().showMessage(f'자세 구간 {len(episodes)}개 검색됨')
+
+    def update_posture_status(self, timestamp, predicted_posture):
+        current_time = timestamp
         COOLDOWN_SECONDS = 10
+
+        # 상태가 실제로 바뀔 때만 알림/스타일 변경
+        event = self.posture_state.update(current_time, predicted_posture)
+        status = self.posture_state.state
+        if status is None:
+            return
         
-        if predicted_posture not in [0, 1]:
-            status = '불량'
-            color = 'red'
-            
-            if (current_time - self.last_alert_time) >= COOLDOWN_SECONDS:
+        if event is not None:
+            if status == PostureStateMachine.BAD:
+                self.alert_log.append(current_time)
+            color = 'red' if status == PostureStateMachine.BAD else 'green'
+            self.posture_status_label.setStyleSheet(f'color: {color}')
+
+            if status == PostureStateMachine.BAD and (current_time - self.last_alert_time) >= COOLDOWN_SECONDS:
                 if self.settings.bad_posture_alert_active and self.settings.bad_posture_app:
                     try:
                         subprocess.Popen([self.settings.bad_posture_app])
                         self.last_alert_time = current_time
                     except Exception as e:
                         QMessageBox.warning(self, '알림 오류', f'나쁜 자세 알림 실행 실패: {str(e)}')
-        else:
-            status = '양호'
-            color = 'green'
-        
-        self.posture_status_label.setText(f'현재 자세: {status} (예측 자세: {predicted_posture})')
-        self.posture_status_label.setStyleSheet(f'color: {color}')
 
-    def log_posture_data(self, sensor_values, predicted_posture):
+        posture = self.posture_state.majority_posture
+        if event is not None or posture != self.shown_posture:
+            self.shown_posture = posture
+            self.posture_status_label.setText(f'현재 자세: {status} (예측 자세: {posture})')
+
+    def log_posture_data(self, timestamp, sensor_values, predicted_posture):
         # 자세가 0일 때는 기록하지 않음
         if predicted_posture == 0:
             return
             
-        current_time = datetime.now().strftime('%H:%M:%S')
-        status = '불량' if predicted_posture != 1 else '양호'
-
-        # 센서값들을 문자열로 변환
-        sensor_values_str = ', '.join([f'{name}: {sensor_values.get(name, 0):.1f}' 
-                                     for name in self.sensor_names])
-        
-        row_position = self.stats_table.rowCount()
-        self.stats_table.insertRow(row_position)
-        
-        self.stats_table.setItem(row_position, 0, QTableWidgetItem(current_time))
-        self.stats_table.setItem(row_position, 1, QTableWidgetItem(status))
-        self.stats_table.setItem(row_position, 2, QTableWidgetItem(sensor_values_str))
-        self.stats_table.setItem(row_position, 3, QTableWidgetItem(str(predicted_posture)))
-
-        color = 'pink' if status == '불량' else 'lightgreen'
-        for col in range(4):
-            self.stats_table.item(row_position, col).setBackground(QColor(color))
-
-        stat_entry = {
-            'time': current_time,
-            'status': status,
-            'sensor_values': sensor_values_str,
-            'predicted_posture': predicted_posture
-        }
-        self.stats_data.append(stat_entry)
-        self.settings.save_stats(self.stats_data)
+        values = [sensor_values.get(name, 0) for name in self.sensor_names]
+        record = make_record(timestamp, values, predicted_posture, self.latest_features)
+
+        # 실시간 보기일 때만 테이블에 추가 (날짜를 골라 보는 중이면 그대로 둠)
+        if self.stats_day_combo.currentData() is None:
+            self.stats_model.append(record)
+        # 저장 스레드로 보내 날짜별 저장소에 추가
+        self.stats_data.append(record)
+        if len(self.stats_data.days()) != self.stats_day_combo.count() - 1:
+            self.refresh_stats_days()  # 날짜가 바뀜
+        self.update_stats_summary()
 
 
 
@@ -722,6 +1504,35 @@ class PostureMonitorApp(QMainWindow):
             self.settings.toast_app = file_path
             self.settings.save_settings()
 
+    def load_local_classifier(self):
+        self.classifier = None
+        if not self.settings.classifier_model:
+            return
+        try:
+            self.classifier = load_classifier(self.settings.classifier_model)
+        except Exception as e:
+            QMessageBox.warning(self, '분류 모델 오류', f'분류 모델 로드 실패: {str(e)}')
+
+    def browse_classifier_model(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "자세 분류 모델 선택",
+            "",
+            "모델 파일 (*.npz);;모든 파일 (*.*)"
+        )
+        if file_path:
+            self.classifier_model_path.setText(file_path)
+            self.settings.classifier_model = file_path
+            self.settings.save_settings()
+            self.load_local_classifier()
+
+    def clear_classifier_model(self):
+        """로컬 분류기 해제 (서버 예측 사용)"""
+        self.classifier_model_path.setText('')
+        self.settings.classifier_model = ''
+        self.settings.save_settings()
+        self.classifier = None
+
     def toggle_bad_posture_alert(self, state):
         self.settings.bad_posture_alert_active = bool(state)
         self.settings.save_settings()
@@ -889,8 +1700,74 @@ class PostureMonitorApp(QMainWindow):
         self.user_age.valueChanged.connect(self.on_user_info_changed)
         user_info_layout.addRow('나이:', self.user_age)
 
+        relearn_button = QPushButton('기준 자세 다시 학습')
+        relearn_button.clicked.connect(self.relearn_baseline)
+        user_info_layout.addRow('기준 자세:', relearn_button)
+
         user_info_group.setLayout(user_info_layout)
         settings_layout.addWidget(user_info_group)
+
+        # 센서 필터 설정
+        filter_group = QGroupBox('센서 필터')
+        filter_layout = QFormLayout()
+
+        self.sensor_filter_combo = QComboBox()
+        for label, name in [('사용 안 함', 'none'), ('지수 이동 평균', 'ema'),
+                            ('이동 중앙값', 'median'), ('저역 통과 (IIR)', 'lowpass')]:
+            self.sensor_filter_combo.addItem(label, name)
+        self.sensor_filter_combo.setCurrentIndex(
+            max(self.sensor_filter_combo.findData(self.settings.sensor_filter), 0))
+        self.sensor_filter_combo.currentIndexChanged.connect(self.on_sensor_filter_changed)
+        filter_layout.addRow('노이즈 필터:', self.sensor_filter_combo)
+
+        filter_group.setLayout(filter_layout)
+        settings_layout.addWidget(filter_group)
+
+        # 자세 분류 모델 (비워두면 서버 예측 사용)
+        classifier_group = QGroupBox('자세 분류')
+        classifier_layout = QFormLayout()
+
+        self.classifier_model_path = QLineEdit()
+        self.classifier_model_path.setText(self.settings.classifier_model)
+        self.classifier_model_path.setReadOnly(True)
+        classifier_browse_button = QPushButton('찾아보기')
+        classifier_browse_button.clicked.connect(self.browse_classifier_model)
+        classifier_clear_button = QPushButton('서버 예측 사용')
+        classifier_clear_button.clicked.connect(self.clear_classifier_model)
+
+        classifier_model_layout = QHBoxLayout()
+        classifier_model_layout.addWidget(self.classifier_model_path)
+        classifier_model_layout.addWidget(classifier_browse_button)
+        classifier_model_layout.addWidget(classifier_clear_button)
+        classifier_layout.addRow('로컬 분류 모델:', classifier_model_layout)
+
+        classifier_group.setLayout(classifier_layout)
+        settings_layout.addWidget(classifier_group)
+
+        # 센서 보정 (기준 하중을 단계별로 올려 측정)
+        calibration_group = QGroupBox('센서 보정')
+        calibration_layout = QFormLayout()
+
+        self.calibration_load_input = QDoubleSpinBox()
+        self.calibration_load_input.setRange(0.0, 200.0)
+        self.calibration_load_input.setToolTip('매트 전체에 올린 무게. 첫 단계는 빈 매트(0 kg) 로 측정하세요.')
+        calibration_layout.addRow('기준 하중 (매트 전체, kg):', self.calibration_load_input)
+
+        calibration_buttons = QHBoxLayout()
+        for label, handler in [('측정', self.start_calibration_step),
+                               ('보정 저장', self.save_calibration),
+                               ('초기화', self.reset_calibration)]:
+            button = QPushButton(label)
+            button.clicked.connect(handler)
+            calibration_buttons.addWidget(button)
+        calibration_layout.addRow(calibration_buttons)
+
+        self.calibration_status_label = QLabel('')
+        calibration_layout.addRow('상태:', self.calibration_status_label)
+        self.update_calibration_status()
+
+        calibration_group.setLayout(calibration_layout)
+        settings_layout.addWidget(calibration_group)
         
         settings_tab.setLayout(settings_layout)
 
@@ -933,6 +1810,7 @@ class PostureMonitorApp(QMainWindow):
         self.settings.user_gender = self.user_gender.currentText()
         self.settings.user_age = self.user_age.value()
         self.settings.save_settings()
+        self.baseline.set_profile(self.settings.user_weight, self.calibration.unit)
 
     def create_device_tab(self):
         device_tab = QWidget()
@@ -942,6 +1820,8 @@ class PostureMonitorApp(QMainWindow):
         status_layout = QVBoxLayout()
         self.status_label = QLabel('연결 상태: 미연결')
         status_layout.addWidget(self.status_label)
+        self.sensor_health_label = QLabel('센서 상태: 확인 중...')
+        status_layout.addWidget(self.sensor_health_label)
         status_group.setLayout(status_layout)
         device_layout.addWidget(status_group)
 
@@ -999,10 +1879,33 @@ class PostureMonitorApp(QMainWindow):
 
         # 상태 그룹
         status_group = QGroupBox('현재 자세 상태')
+        status_row_layout = QHBoxLayout()
         status_layout = QVBoxLayout()
         self.posture_status_label = QLabel('현재 자세: 측정 중...')
         status_layout.addWidget(self.posture_status_label)
-        status_group.setLayout(status_layout)
+        self.live_stats_label = QLabel('')
+        status_layout.addWidget(self.live_stats_label)
+        self.features_label = QLabel('')
+        status_layout.addWidget(self.features_label)
+
+        # 그래프 표시 구간 선택
+        self.graph_span_combo = QComboBox()
+        for label, span in [('최근 100개', 0), ('10분', 600), ('1시간', 3600),
+                            ('8시간', 8 * 3600), ('24시간', 24 * 3600)]:
+            self.graph_span_combo.addItem(label, span)
+        self.graph_span_combo.currentIndexChanged.connect(self.on_graph_span_changed)
+        span_layout = QHBoxLayout()
+        span_layout.addWidget(QLabel('표시 구간:'))
+        span_layout.addWidget(self.graph_span_combo)
+        span_layout.addStretch(1)
+        status_layout.addLayout(span_layout)
+        status_row_layout.addLayout(status_layout, 1)
+
+        # 매트 압력 분포 (압력 중심 표시)
+        self.pressure_map_canvas = MplCanvas(self, width=2, height=2, dpi=100)
+        self.pressure_map_canvas.setFixedSize(200, 200)
+        status_row_layout.addWidget(self.pressure_map_canvas)
+        status_group.setLayout(status_row_layout)
         main_layout.addWidget(status_group)
 
         # 스크롤 영역 생성
@@ -1039,10 +1942,27 @@ class PostureMonitorApp(QMainWindow):
     def create_stats_tab(self):
         stats_tab = QWidget()
         stats_layout = QVBoxLayout()
-        
-        self.stats_table = QTableWidget()
-        self.stats_table.setColumnCount(4)
-        self.stats_table.setHorizontalHeaderLabels(['시간', '자세 상태', '압력값', '예측 자세'])
+
+        # 날짜 선택 (날짜별로 나눠 저장된 기록 중 하루만 열기)
+        day_layout = QHBoxLayout()
+        self.stats_day_combo = QComboBox()
+        self.stats_day_combo.currentIndexChanged.connect(self.on_stats_day_changed)
+        self.drop_day_button = QPushButton('이 날짜 삭제')
+        self.drop_day_button.setEnabled(False)
+        self.drop_day_button.clicked.connect(self.drop_stats_day)
+        day_layout.addWidget(QLabel('날짜:'))
+        day_layout.addWidget(self.stats_day_combo, 1)
+        day_layout.addWidget(self.drop_day_button)
+        stats_layout.addLayout(day_layout)
+        
+        self.stats_summary_label = QLabel()
+        stats_layout.addWidget(self.stats_summary_label)
+
+        # 기록 테이블 (모델이 필요한 페이지만 읽어 표시)
+        self.stats_model = RecordTableModel(self)
+        self.stats_table = QTableView()
+        self.stats_table.setModel(self.stats_model)
+        self.stats_table.verticalScrollBar().valueChanged.connect(self.on_stats_scrolled)
         
         # 각 열의 너비 설정
         self.stats_table.horizontalHeader().setStretchLastSection(False)  # 마지막 열 자동 늘리기 해제
@@ -1067,6 +1987,43 @@ class PostureMonitorApp(QMainWindow):
         stats_buttons_layout.addWidget(export_button)
         stats_buttons_layout.addWidget(clear_button)
         stats_layout.addLayout(stats_buttons_layout)
+
+        # 자세 구간 검색
+        episode_group = QGroupBox('자세 구간 검색')
+        episode_layout = QVBoxLayout()
+        episode_form = QHBoxLayout()
+
+        self.episode_posture_input = QSpinBox()
+        self.episode_posture_input.setRange(-1, 255)
+        self.episode_posture_input.setSpecialValueText('전체')
+        self.episode_posture_input.setValue(-1)
+        self.episode_duration_input = QDoubleSpinBox()
+        self.episode_duration_input.setRange(0.0, 600.0)
+        self.episode_period_combo = QComboBox()
+        for label, seconds in [('오늘', 86400), ('최근 7일', 7 * 86400),
+                               ('최근 30일', 30 * 86400), ('전체', None)]:
+            self.episode_period_combo.addItem(label, seconds)
+        search_button = QPushButton('검색')
+        search_button.clicked.connect(self.search_episodes)
+
+        episode_form.addWidget(QLabel('자세:'))
+        episode_form.addWidget(self.episode_posture_input)
+        episode_form.addWidget(QLabel('최소 시간 (분):'))
+        episode_form.addWidget(self.episode_duration_input)
+        episode_form.addWidget(QLabel('기간:'))
+        episode_form.addWidget(self.episode_period_combo)
+        episode_form.addWidget(search_button)
+        episode_layout.addLayout(episode_form)
+
+        self.episode_table = QTableWidget()
+        self.episode_table.setColumnCount(4)
+        self.episode_table.setHorizontalHeaderLabels(['시작 시간', '지속 시간 (분)', '이전 자세', '자세'])
+        self.episode_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.episode_table.setFixedHeight(200)
+        episode_layout.addWidget(self.episode_table)
+
+        episode_group.setLayout(episode_layout)
+        stats_layout.addWidget(episode_group)
         
         stats_tab.setLayout(stats_layout)
         return stats_tab
@@ -1086,13 +2043,11 @@ class PostureMonitorApp(QMainWindow):
             self.status_label.setStyleSheet('color: green')
             
             try:
-                # JSON 파일에서 weight와 height만 읽어서 전송
-                with open('app_settings.json', 'r') as f:
-                    settings = json.load(f)
-                    user_data = {
-                        "weight": settings.get("user_weight"),
-                        "height": settings.get("user_height")
-                    }
+                # 메모리의 설정에서 weight와 height만 전송
+                user_data = {
+                    "weight": self.settings.user_weight,
+                    "height": self.settings.user_height
+                }
                 
                 # 사용자 데이터를 JSON 문자열로 변환하여 전송
                 if self.data_receiver.socket.sendall(json.dumps(user_data).encode('utf-8')):
@@ -1125,22 +2080,52 @@ class PostureMonitorApp(QMainWindow):
         self.reset_graph_data()  # 그래프 데이터 초기화
 
     def export_data(self):
-        try:
-            filename, _ = QFileDialog.getSaveFileName(
-                self,
-                "데이터 내보내기",
-                f'posture_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
-                "CSV 파일 (*.csv);;모든 파일 (*.*)"
-            )
-            
-            if filename:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write('시간,자세 상태,압력값,예측 자세\n')
-                    for stat in self.stats_data:
-                        f.write(f'{stat["time"]},{stat["status"]},{stat["sensor_values"]},{stat["predicted_posture"]}\n')
-                QMessageBox.information(self, '내보내기 성공', f'데이터가 {filename}에 저장되었습니다.')
-        except Exception as e:
-            QMessageBox.warning(self, '내보내기 실패', f'데이터 내보내기 실패: {str(e)}')
+        """조건에 맞는 기록을 백그라운드에서 CSV 또는 열 단위 바이너리로 내보내기"""
+        dialog = ExportDialog(self.stats_data.days(), self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        start, end, posture = dialog.conditions()
+
+        columnar_filter = "열 단위 바이너리 폴더 (*.cols)"
+        filename, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "데이터 내보내기",
+            f'posture_data_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+            f"CSV 파일 (*.csv);;{columnar_filter};;모든 파일 (*.*)"
+        )
+        if not filename:
+            return
+
+        self.stats_data.flush()  # 저장 대기 중인 기록까지 포함
+        self.export_progress = QProgressDialog('데이터 내보내는 중...', '취소', 0, 100, self)
+        self.export_progress.setWindowTitle('데이터 내보내기')
+        self.export_progress.setMinimumDuration(0)
+        if selected_filter == columnar_filter:
+            # 기록과 원본 프레임을 열마다 .npy 파일로 (np.load(mmap_mode='r') 로 열 수 있음)
+            filename = os.path.splitext(filename)[0] + '.cols'
+            self.export_worker = ExportWorker(export_columnar, self.stats_data, self.frame_archive,
+                                              filename, start, end, posture)
+        else:
+            self.export_worker = ExportWorker(export_csv, self.stats_data, filename, start, end, posture)
+        self.export_worker.progress.connect(self.export_progress.setValue)
+        self.export_worker.finished.connect(lambda rows: self.on_export_finished(filename, rows))
+        self.export_worker.failed.connect(self.on_export_failed)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        self.export_worker.start()
+
+    def on_export_finished(self, filename, rows):
+        self.export_progress.reset()
+        if rows is None:
+            self.statusBar().showMessage('데이터 내보내기가 취소되었습니다.')
+        elif isinstance(rows, tuple):
+            QMessageBox.information(self, '내보내기 성공',
+                                    f'기록 {rows[0]}개, 원본 프레임 {rows[1]}개가 {filename}에 저장되었습니다.')
+        else:
+            QMessageBox.information(self, '내보내기 성공', f'{rows}개 기록이 {filename}에 저장되었습니다.')
+
+    def on_export_failed(self, error_message):
+        self.export_progress.reset()
+        QMessageBox.warning(self, '내보내기 실패', f'데이터 내보내기 실패: {error_message}')
 
     def clear_stats(self):
         reply = QMessageBox.question(self, '기록 삭제', 
@@ -1148,9 +2133,20 @@ class PostureMonitorApp(QMainWindow):
                                    QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            self.stats_table.setRowCount(0)
-            self.stats_data = []  # 데이터 리스트 초기화
+            self.stats_model.clear()
+            self.frame_archive.clear()
+            self.stats_data.clear()  # 데이터 초기화
             self.settings.save_stats(self.stats_data)  # 빈 데이터 저장
+            self.refresh_stats_days()
+            self.load_saved_stats()
+            self.writer.drain()  # 저장 대기 중인 구간/세션을 먼저 씀
+            self.event_store.clear()
+            self.session_store.clear()
+            self.alert_log.clear()
+            if self.rollup_thread is not None:
+                self.rollup_thread.join()
+            self.rollups.clear()
+            self.episode_table.setRowCount(0)
             self.statusBar().showMessage('기록이 삭제되었습니다.')
 
 
@@ -1177,7 +2173,63 @@ class PostureMonitorApp(QMainWindow):
         duration_layout.addWidget(duration_canvas)
         duration_group.setLayout(duration_layout)
         analysis_layout.addWidget(duration_group)
-        
+
+        # 센서별 최근 압력 통계 그래프
+        channel_stats_group = QGroupBox('센서별 최근 압력 통계')
+        channel_stats_layout = QVBoxLayout()
+
+        channel_stats_canvas = MplCanvas(self, width=8, height=4, dpi=100)
+        self.channel_stats_canvas = channel_stats_canvas
+        channel_stats_layout.addWidget(channel_stats_canvas)
+        channel_stats_group.setLayout(channel_stats_layout)
+        analysis_layout.addWidget(channel_stats_group)
+
+        # 오늘 센서별 압력 분포 그래프
+        distribution_group = QGroupBox('오늘 센서별 압력 분포')
+        distribution_layout = QVBoxLayout()
+
+        distribution_canvas = MplCanvas(self, width=8, height=4, dpi=100)
+        self.distribution_canvas = distribution_canvas
+        distribution_layout.addWidget(distribution_canvas)
+        distribution_group.setLayout(distribution_layout)
+        analysis_layout.addWidget(distribution_group)
+        
+        # 기간별 자세 요약 (분/시간/일 단위 요약에서 읽음)
+        rollup_group = QGroupBox('기간별 자세 요약')
+        rollup_layout = QVBoxLayout()
+        self.rollup_period_combo = QComboBox()
+        for label, seconds in [('최근 7일', 7 * 86400), ('최근 30일', 30 * 86400),
+                               ('최근 1년', 365 * 86400)]:
+            self.rollup_period_combo.addItem(label, seconds)
+        self.rollup_period_combo.currentIndexChanged.connect(self.update_rollup_graph)
+        rollup_layout.addWidget(self.rollup_period_combo)
+
+        rollup_canvas = MplCanvas(self, width=8, height=4, dpi=100)
+        self.rollup_canvas = rollup_canvas
+        rollup_layout.addWidget(rollup_canvas)
+        rollup_group.setLayout(rollup_layout)
+        analysis_layout.addWidget(rollup_group)
+
+        # 보관된 원본 데이터 요약 (요청할 때만 계산)
+        archive_group = QGroupBox('원본 데이터 요약')
+        archive_layout = QVBoxLayout()
+        archive_form = QHBoxLayout()
+        self.archive_period_combo = QComboBox()
+        for label, seconds in [('오늘', 86400), ('최근 7일', 7 * 86400), ('최근 30일', 30 * 86400)]:
+            self.archive_period_combo.addItem(label, seconds)
+        archive_button = QPushButton('요약 계산')
+        archive_button.clicked.connect(self.update_archive_summary)
+        archive_form.addWidget(QLabel('기간:'))
+        archive_form.addWidget(self.archive_period_combo)
+        archive_form.addWidget(archive_button)
+        archive_layout.addLayout(archive_form)
+
+        archive_canvas = MplCanvas(self, width=8, height=4, dpi=100)
+        self.archive_canvas = archive_canvas
+        archive_layout.addWidget(archive_canvas)
+        archive_group.setLayout(archive_layout)
+        analysis_layout.addWidget(archive_group)
+
         # 타이머 설정 (5초마다 업데이트)
         self.analysis_timer = QTimer()
         self.analysis_timer.timeout.connect(self.update_analysis_graphs)
@@ -1196,8 +2248,13 @@ class PostureMonitorApp(QMainWindow):
         self.data_receiver.stop_receiving()
         
         # 설정과 통계 저장
-        self.settings.save_settings()
+        self.settings.write_settings()
         self.settings.save_stats(self.stats_data)
+        self.record_posture_episodes(self.sessionizer.close_stream())
+        self.sessionizer.save(self.settings.durations_file)
+        self.sketches.save(self.settings.sketches_dir)
+        self.frame_archive.flush()
+        self.writer.stop()  # 남은 기록을 모두 쓰고 저장 스레드 종료
         
         QApplication.quit()
 
@@ -1230,8 +2287,13 @@ class PostureMonitorApp(QMainWindow):
                 self.data_receiver.stop_receiving()
                 
                 # 설정과 통계 저장
-                self.settings.save_settings()
+                self.settings.write_settings()
                 self.settings.save_stats(self.stats_data)
+                self.record_posture_episodes(self.sessionizer.close_stream())
+                self.sessionizer.save(self.settings.durations_file)
+                self.sketches.save(self.settings.sketches_dir)
+                self.frame_archive.flush()
+                self.writer.stop()  # 남은 기록을 모두 쓰고 저장 스레드 종료
                 
                 event.accept()  # 이벤트 승인하여 종료 진행
                 QApplication.quit()
@@ -0,0 +1,74 @@
+# 자세 분석 모듈 테스트 (python -m unittest test_posture_analysis)
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from posture_analysis import BaselineNormalizer, extract_features
+
+
+def neutral_frames(neutral, count=300, noise=0.02, seed=0):
+    """중립 자세 주변에서 흔들리는 (count, 16) 하중 배치"""
+    rng = np.random.default_rng(seed)
+    return neutral * (1 + noise * rng.standard_normal((count, len(neutral))))
+
+
+class BaselineNormalizerTest(unittest.TestCase):
+
+    def setUp(self):
+        # 채널마다 중립 자세 하중이 다름 (A1 은 A2 의 세 배)
+        self.neutral = np.linspace(1.0, 4.0, 16)[::-1] * 3.0
+        self.neutral[0], self.neutral[1] = 6.0, 2.0
+
+    def learned(self, neutral, weight=0.0, unit='kg'):
+        normalizer = BaselineNormalizer(weight, unit)
+        normalizer.process(None, neutral_frames(neutral))
+        self.assertFalse(normalizer.learning)
+        return normalizer
+
+    def test_channels_with_different_baselines_get_different_scales(self):
+        normalizer = self.learned(self.neutral)
+        self.assertNotAlmostEqual(normalizer.scale[0], normalizer.scale[1])
+        self.assertAlmostEqual(normalizer.scale[1] / normalizer.scale[0], 3.0, delta=0.1)
+
+        # 같은 하중이라도 중립 자세 기준이 다른 채널은 다르게 정규화됨
+        output = normalizer.process(None, np.full(16, 2.0))[0]
+        self.assertGreater(output[1], output[0] * 2.5)
+
+    def test_neutral_posture_maps_to_equal_shares(self):
+        normalizer = self.learned(self.neutral)
+        output = normalizer.process(None, self.neutral)[0]
+        np.testing.assert_allclose(output, 1 / 16, rtol=0.05)
+        features = extract_features(output)
+        self.assertAlmostEqual(float(features['total'][0]), 1.0, delta=0.05)
+        self.assertAlmostEqual(float(features['cop_x'][0]), 0.0, delta=0.05)
+
+    def test_features_match_across_body_weights(self):
+        light = self.learned(self.neutral * 45 / self.neutral.sum() * 0.75, weight=45)
+        heavy = self.learned(self.neutral * 100 / self.neutral.sum() * 0.75, weight=100)
+        leaning = self.neutral * np.where(np.arange(16) % 4 < 2, 1.3, 0.7)
+        light_out = light.process(None, leaning * 45 / self.neutral.sum() * 0.75)
+        heavy_out = heavy.process(None, leaning * 100 / self.neutral.sum() * 0.75)
+        np.testing.assert_allclose(light_out, heavy_out, rtol=0.05)
+
+    def test_unloaded_channel_does_not_blow_up(self):
+        neutral = self.neutral.copy()
+        neutral[15] = 0.0
+        normalizer = self.learned(neutral)
+        self.assertTrue(np.isfinite(normalizer.scale).all())
+        self.assertLess(normalizer.process(None, np.full(16, 1.0))[0][15], 1.0)
+
+    def test_save_and_load_keeps_coefficients(self):
+        normalizer = self.learned(self.neutral, weight=70)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            normalizer.save(path)
+            loaded = BaselineNormalizer.load(path, 70, 'kg')
+        self.assertEqual(loaded.count, normalizer.count)
+        np.testing.assert_allclose(loaded.scale, normalizer.scale)
+
+
+if __name__ == '__main__':
+    unittest.main()